@@ -1,26 +1,96 @@
 from flask import Flask  # Importa a classe principal do Flask
 from flask_bcrypt import Bcrypt  # Importa a extensão para hash de senhas
 from flask_login import LoginManager  # Importa a extensão para gerenciamento de login
+from flask_migrate import Migrate  # Importa as migrações do banco (Alembic)
 from flask_sqlalchemy import (
     SQLAlchemy,  # Importa a extensão para banco de dados SQLAlchemy
 )
 from flask_wtf.csrf import CSRFProtect  # Importa proteção CSRF para formulários
+from werkzeug.middleware.proxy_fix import ProxyFix  # Importa o ajuste para proxies
 
-app = Flask(__name__)  # Cria a instância principal do Flask
-
-# Configurações da aplicação
-app.config["SECRET_KEY"] = (
-    "b85c99d270d663b913c678fd1565babf"  # Chave secreta para sessões e CSRF
-)
-app.config["SQLALCHEMY_DATABASE_URI"] = (
-    "sqlite:///comunidade.db"  # Caminho do banco de dados SQLite
+from app.cache import (  # Importa os caches de fragmentos e de usuários
+    CacheFragmentos,
+    CacheUsuarios,
 )
+from app.compressao import Compressao  # Importa a compressão das respostas
+from app.config import Config  # Importa as configurações padrão
+from app.estaticos import Estaticos  # Importa os arquivos estáticos versionados
+from app.leitura import SessaoRoteada  # Importa a sessão com o banco de leitura
+from app.limites import LimitadorLogin  # Importa o limitador de tentativas de login
+from app.metricas import Metricas  # Importa a instrumentação das requisições
 
-db = SQLAlchemy(app)  # Inicializa o banco de dados
-bcrypt = Bcrypt(app)  # Inicializa o Bcrypt para hash de senhas
-login_manager = LoginManager(app)  # Inicializa o gerenciador de login
-login_manager.login_view = "login_registrar"  # Define a view de login padrão
-csrf = CSRFProtect(app)  # Inicializa a proteção CSRF
+# Extensões criadas sem aplicação; são ligadas a cada app em create_app
+db = SQLAlchemy(
+    session_options={"class_": SessaoRoteada}
+)  # Banco de dados (leituras das rotas somente leitura no bind 'leitura')
+bcrypt = Bcrypt()  # Bcrypt para hash de senhas
+login_manager = LoginManager()  # Gerenciador de login
+login_manager.login_view = "principal.login_registrar"  # Define a view de login padrão
 login_manager.login_message_category = "alert-info"  # Categoria da mensagem de login
+csrf = CSRFProtect()  # Proteção CSRF
+migrate = Migrate()  # Migrações do esquema do banco
+cache_fragmentos = CacheFragmentos()  # Cache de cards renderizados
+cache_usuarios = CacheUsuarios()  # Cache do carregamento de usuários
+limitador_login = LimitadorLogin()  # Limite de tentativas de login
+metricas = Metricas()  # Instrumentação opcional das requisições
+estaticos = Estaticos()  # Arquivos estáticos versionados e pré-comprimidos
+compressao = Compressao()  # Compressão das respostas dinâmicas
+
+
+def create_app(config=None):
+    """
+    Cria e configura uma instância da aplicação.
+    Parâmetros:
+        config (type | dict | None): Classe de configuração (padrão: Config, que lê
+            as variáveis de ambiente) ou dicionário com valores que sobrescrevem
+            os padrões.
+    Retorna:
+        Flask: Aplicação configurada, com extensões, rotas e comandos registrados.
+    """
+    app = Flask(__name__)  # Cria a instância principal do Flask
+    if isinstance(config, dict):
+        app.config.from_object(Config)
+        app.config.update(config)  # Sobrescreve apenas os valores informados
+    else:
+        app.config.from_object(config or Config)
+    saltos = app.config.get("PROXY_SALTOS", 0)
+    if saltos:
+        # Atrás de proxies (roteador do Heroku, nginx) o endereço do cliente e o
+        # esquema vêm dos cabeçalhos X-Forwarded-*, e não da conexão
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=saltos, x_proto=saltos)
+
+    db.init_app(app)  # Inicializa o banco de dados
+    bcrypt.init_app(app)  # Inicializa o Bcrypt
+    login_manager.init_app(app)  # Inicializa o gerenciador de login
+    csrf.init_app(app)  # Inicializa a proteção CSRF
+    cache_fragmentos.init_app(app)  # Inicializa o cache de cards
+    cache_usuarios.init_app(app)  # Inicializa o cache de usuários
+    limitador_login.init_app(app)  # Inicializa o limite de tentativas
+    estaticos.init_app(app)  # Carrega o manifesto dos arquivos estáticos
+
+    from app.banco import (  # Importa os ajustes do SQLite e o filtro das migrações
+        configurar_banco,
+        incluir_no_esquema,
+    )
+
+    configurar_banco(app)  # Aplica WAL e PRAGMAs em cada conexão SQLite
+    migrate.init_app(
+        app, db, render_as_batch=True, include_name=incluir_no_esquema
+    )  # Comandos 'flask db' (em lote, pois o SQLite não altera colunas no lugar)
+    metricas.init_app(app)  # Mede as requisições, se METRICAS_ATIVAS
+    compressao.init_app(app)  # Depois das métricas, para que meçam a compressão
+
+    from app import comandos, imagens, models  # noqa: F401 (registra modelos e loader)
+    from app.api import api  # Importa o blueprint da API JSON
+    from app.routes import principal  # Importa o blueprint com as rotas
 
-from app import routes  # Importa as rotas da aplicação (deve ser feito
+    app.register_blueprint(principal)  # Registra as rotas
+    app.register_blueprint(api)  # Registra a API em /api/v1
+    app.json.sort_keys = False  # JSON na ordem dos campos consultados
+    app.json.ensure_ascii = False  # Acentos em UTF-8, sem escapes \uXXXX
+    app.add_template_global(imagens.url_foto)  # Funções das fotos nos templates
+    app.add_template_global(imagens.srcset_foto)
+    app.add_template_global(estaticos.url, "url_estatico")  # CSS e imagens fixas
+    for comando in comandos.COMANDOS:
+        app.cli.add_command(comando)  # Registra os comandos 'flask ...'
+    return app
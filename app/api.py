@@ -0,0 +1,329 @@
+from datetime import timezone  # Importa o fuso UTC das datas do banco
+
+from flask import (  # Importa funções do Flask
+    Blueprint,
+    abort,
+    current_app,
+    jsonify,
+    request,
+)
+from flask_login import login_required  # Importa a exigência de login
+from sqlalchemy import func, select  # Importa funções SQL e consultas
+from werkzeug.exceptions import HTTPException  # Importa os erros HTTP
+
+from app import db, login_manager  # Importa o banco e o gerenciador de login
+from app.condicional import (  # Importa as respostas condicionais (ETag)
+    RespostaCondicional,
+    versao_dados,
+)
+from app.imagens import url_foto  # Importa o endereço das fotos de perfil
+from app.leitura import somente_leitura  # Importa o roteamento das leituras
+from app.models import Curso, Post, Usuario, usuario_curso  # Importa os modelos
+
+api = Blueprint("api", __name__, url_prefix="/api/v1")  # API JSON, versão 1
+login_manager.blueprint_login_views["api"] = None  # Sem login: 401, sem redirecionar
+
+
+def _data_iso(data):
+    return data.replace(tzinfo=timezone.utc).isoformat()  # O banco guarda em UTC
+
+
+CAMPOS_POST = {
+    "id": Post.id,
+    "titulo": Post.titulo,
+    "conteudo": Post.conteudo,
+    "data_postagem": Post.data_postagem,
+    "data_edicao": Post.data_edicao,
+    "usuario_id": Post.usuario_id,
+    "autor": Usuario.username,  # Exige a junção com o autor
+}  # Campo da resposta -> coluna consultada
+CAMPOS_USUARIO = {
+    "id": Usuario.id,
+    "username": Usuario.username,
+    "foto_perfil": Usuario.foto_perfil,
+    "posts": select(func.count(Post.id))
+    .where(Post.usuario_id == Usuario.id)
+    .scalar_subquery(),  # Contagem atendida pelo índice ix_post_usuario_id_id
+    "atualizado_em": Usuario.atualizado_em,
+    "cursos": None,  # Buscados em uma segunda consulta, para todos de uma vez
+}  # Campo da resposta -> coluna consultada
+CONVERSORES = {
+    "data_postagem": _data_iso,
+    "data_edicao": _data_iso,
+    "atualizado_em": _data_iso,
+    "foto_perfil": url_foto,
+}  # Campos que precisam de conversão para o JSON
+
+
+@api.errorhandler(HTTPException)
+def erro_http(erro):
+    """
+    Responde os erros da API em JSON, em vez das páginas de erro do site.
+    Parâmetros:
+        erro (HTTPException): Erro da requisição.
+    Retorna:
+        tuple[Response, int]: Mensagem do erro e o seu código de status.
+    """
+    return jsonify(erro=erro.description), erro.code
+
+
+def _campos(disponiveis):
+    """
+    Lê o parâmetro 'campos' (nomes separados por vírgula), que limita os campos
+    devolvidos. O 'id' é sempre incluído, pois é o cursor da paginação.
+    Parâmetros:
+        disponiveis (dict): Campos aceitos pelo recurso.
+    Retorna:
+        list[str]: Campos pedidos, na ordem de 'disponiveis'.
+    """
+    pedidos = request.args.get("campos")
+    if not pedidos:
+        return list(disponiveis)  # Sem o parâmetro: todos os campos
+    nomes = {nome.strip() for nome in pedidos.split(",") if nome.strip()}
+    desconhecidos = nomes - disponiveis.keys()
+    if desconhecidos:
+        abort(400, description=f"Campos inválidos: {', '.join(sorted(desconhecidos))}")
+    return [nome for nome in disponiveis if nome in nomes or nome == "id"]
+
+
+def _limite(padrao):
+    """
+    Lê o parâmetro 'limite' (itens por página), entre 1 e API_LIMITE_MAXIMO.
+    Parâmetros:
+        padrao (int): Itens por página sem o parâmetro.
+    Retorna:
+        int: Itens por página.
+    """
+    limite = request.args.get("limite", padrao, type=int)
+    return max(1, min(limite, current_app.config["API_LIMITE_MAXIMO"]))
+
+
+def _ids():
+    """
+    Lê o parâmetro 'ids' (IDs separados por vírgula) do endpoint de lote.
+    Retorna:
+        list[int]: IDs pedidos, sem repetições e na ordem recebida.
+    """
+    maximo = current_app.config["API_LOTE_MAXIMO"]  # IDs por requisição
+    try:
+        ids = list(
+            dict.fromkeys(int(i) for i in request.args.get("ids", "").split(",") if i)
+        )  # Remove as repetições mantendo a ordem
+    except ValueError:
+        abort(400, description="Os IDs devem ser números separados por vírgula")
+    if not ids or len(ids) > maximo:
+        abort(400, description=f"Informe de 1 a {maximo} IDs no parâmetro 'ids'")
+    return ids
+
+
+def _serializar(nomes, linhas):
+    """
+    Monta os dicionários da resposta a partir das linhas da consulta, sem
+    carregar objetos do ORM.
+    Parâmetros:
+        nomes (list[str]): Campos, na ordem das colunas da consulta.
+        linhas (list[Row]): Linhas da consulta.
+    Retorna:
+        list[dict]: Um dicionário por linha.
+    """
+    conversores = [CONVERSORES.get(nome) for nome in nomes]  # Uma vez por consulta
+    return [
+        {
+            nome: conversor(valor) if conversor and valor is not None else valor
+            for nome, conversor, valor in zip(nomes, conversores, linha)
+        }
+        for linha in linhas
+    ]
+
+
+def _consultar_posts(nomes, *filtros, limite=None):
+    """
+    Busca as colunas pedidas dos posts, do mais novo para o mais antigo.
+    Parâmetros:
+        nomes (list[str]): Campos pedidos.
+        *filtros: Condições do WHERE.
+        limite (int | None): Quantidade máxima de linhas.
+    Retorna:
+        list[dict]: Posts serializados.
+    """
+    consulta = (
+        select(*(CAMPOS_POST[nome].label(nome) for nome in nomes))
+        .select_from(Post)
+        .where(*filtros)
+        .order_by(Post.id.desc())
+        .limit(limite)
+    )
+    if "autor" in nomes:
+        consulta = consulta.join(Usuario, Usuario.id == Post.usuario_id)
+    return _serializar(nomes, db.session.execute(consulta).all())
+
+
+def _consultar_usuarios(nomes, *filtros, limite=None):
+    """
+    Busca as colunas pedidas dos usuários, em ordem de ID. Os cursos de todos
+    os usuários da resposta vêm em uma única consulta extra.
+    Parâmetros:
+        nomes (list[str]): Campos pedidos.
+        *filtros: Condições do WHERE.
+        limite (int | None): Quantidade máxima de linhas.
+    Retorna:
+        list[dict]: Usuários serializados (nunca com e-mail ou senha).
+    """
+    colunas = [nome for nome in nomes if nome != "cursos"]
+    consulta = (
+        select(*(CAMPOS_USUARIO[nome].label(nome) for nome in colunas))
+        .where(*filtros)
+        .order_by(Usuario.id)
+        .limit(limite)
+    )
+    usuarios = _serializar(colunas, db.session.execute(consulta).all())
+    if "cursos" in nomes and usuarios:
+        cursos = {usuario["id"]: [] for usuario in usuarios}
+        for usuario_id, nome in db.session.execute(
+            select(usuario_curso.c.usuario_id, Curso.nome)
+            .join(Curso, Curso.id == usuario_curso.c.curso_id)
+            .where(usuario_curso.c.usuario_id.in_(cursos))
+            .order_by(Curso.nome)
+        ):
+            cursos[usuario_id].append(nome)
+        for usuario in usuarios:
+            usuario["cursos"] = cursos[usuario["id"]]
+    return usuarios
+
+
+def _pagina(dados, limite):
+    """
+    Monta a resposta de uma página, com o cursor da próxima.
+    Parâmetros:
+        dados (list[dict]): Itens buscados (um a mais que o limite, se houver
+            próxima página).
+        limite (int): Itens por página.
+    Retorna:
+        dict: Itens da página e o cursor da próxima (ou None).
+    """
+    proximo = dados[limite - 1]["id"] if len(dados) > limite else None
+    return {"dados": dados[:limite], "proximo": proximo}
+
+
+def _lote(dados, ids):
+    """
+    Monta a resposta de um lote na ordem dos IDs pedidos.
+    Parâmetros:
+        dados (list[dict]): Itens encontrados.
+        ids (list[int]): IDs pedidos.
+    Retorna:
+        dict: Itens encontrados e os IDs que não existem.
+    """
+    por_id = {item["id"]: item for item in dados}
+    return {
+        "dados": [por_id[i] for i in ids if i in por_id],
+        "faltando": [i for i in ids if i not in por_id],
+    }
+
+
+@api.route("/posts")
+@somente_leitura
+def posts():
+    """
+    Lista os posts do mais novo para o mais antigo, paginados por cursor
+    (parâmetro 'antes', com o valor de 'proximo' da página anterior).
+    Parâmetros da URL: 'antes', 'limite' e 'campos'.
+    Retorna:
+        Response: JSON com 'dados' e 'proximo', ou 304.
+    """
+    condicional = RespostaCondicional(
+        *versao_dados(), por_usuario=False
+    )  # Versão dos posts e autores; o JSON é o mesmo para todos os usuários
+    if condicional.nao_modificado:
+        return condicional.responder()  # O cliente já tem esta página
+    nomes = _campos(CAMPOS_POST)
+    limite = _limite(current_app.config["POSTS_POR_PAGINA"])
+    antes = request.args.get("antes", type=int)  # Cursor da página atual
+    filtros = [Post.id < antes] if antes is not None else []
+    dados = _consultar_posts(nomes, *filtros, limite=limite + 1)  # Um a mais
+    return condicional.responder(_pagina(dados, limite))
+
+
+@api.route("/posts/<int:post_id>")
+@somente_leitura
+def post(post_id):
+    """
+    Busca um post.
+    Parâmetros:
+        post_id (int): ID do post.
+    Retorna:
+        Response: JSON do post, 304 ou erro 404.
+    """
+    condicional = RespostaCondicional(
+        *versao_dados(), por_usuario=False
+    )  # Versão dos posts e autores; o JSON é o mesmo para todos os usuários
+    if condicional.nao_modificado:
+        return condicional.responder()  # O cliente já tem este post
+    dados = _consultar_posts(_campos(CAMPOS_POST), Post.id == post_id)
+    if not dados:
+        abort(404, description="Post não encontrado")
+    return condicional.responder(dados[0])
+
+
+@api.route("/posts/lote")
+@somente_leitura
+def posts_lote():
+    """
+    Busca vários posts pelo ID em uma única consulta (parâmetro 'ids', até
+    API_LOTE_MAXIMO IDs separados por vírgula).
+    Retorna:
+        Response: JSON com 'dados' na ordem pedida e 'faltando', ou 304.
+    """
+    condicional = RespostaCondicional(
+        *versao_dados(), por_usuario=False
+    )  # Versão dos posts e autores; o JSON é o mesmo para todos os usuários
+    if condicional.nao_modificado:
+        return condicional.responder()  # O cliente já tem estes posts
+    ids = _ids()
+    dados = _consultar_posts(_campos(CAMPOS_POST), Post.id.in_(ids))
+    return condicional.responder(_lote(dados, ids))
+
+
+@api.route("/usuarios")
+@somente_leitura
+@login_required
+def usuarios():
+    """
+    Lista os usuários em ordem de cadastro, paginados por cursor (parâmetro
+    'depois', com o valor de 'proximo' da página anterior). Exige login, como a
+    página de usuários do site.
+    Parâmetros da URL: 'depois', 'limite' e 'campos'.
+    Retorna:
+        Response: JSON com 'dados' e 'proximo', 304 ou erro 401.
+    """
+    condicional = RespostaCondicional(
+        *versao_dados(), por_usuario=False
+    )  # Versão dos usuários e posts; o JSON é o mesmo para todos os usuários
+    if condicional.nao_modificado:
+        return condicional.responder()  # O cliente já tem esta página
+    nomes = _campos(CAMPOS_USUARIO)
+    limite = _limite(current_app.config["USUARIOS_POR_PAGINA"])
+    depois = request.args.get("depois", type=int)  # Cursor da página atual
+    filtros = [Usuario.id > depois] if depois is not None else []
+    dados = _consultar_usuarios(nomes, *filtros, limite=limite + 1)  # Um a mais
+    return condicional.responder(_pagina(dados, limite))
+
+
+@api.route("/usuarios/lote")
+@somente_leitura
+@login_required
+def usuarios_lote():
+    """
+    Busca vários usuários pelo ID em uma única consulta (parâmetro 'ids', até
+    API_LOTE_MAXIMO IDs separados por vírgula).
+    Retorna:
+        Response: JSON com 'dados' na ordem pedida e 'faltando', 304 ou erro 401.
+    """
+    condicional = RespostaCondicional(
+        *versao_dados(), por_usuario=False
+    )  # Versão dos usuários e posts; o JSON é o mesmo para todos os usuários
+    if condicional.nao_modificado:
+        return condicional.responder()  # O cliente já tem estes usuários
+    ids = _ids()
+    dados = _consultar_usuarios(_campos(CAMPOS_USUARIO), Usuario.id.in_(ids))
+    return condicional.responder(_lote(dados, ids))
@@ -0,0 +1,123 @@
+import random  # Importa gerador aleatório para espalhar as novas tentativas
+import threading  # Importa primitivas de sincronização entre threads
+import time  # Importa funções de tempo para esperar entre tentativas
+
+from flask import current_app  # Importa a aplicação da requisição atual
+from sqlalchemy import event  # Importa eventos do SQLAlchemy
+from sqlalchemy.exc import OperationalError  # Importa o erro de banco travado
+
+from app import db  # Importa a instância do banco de dados
+from app.leitura import marcar_escrita  # Importa a consistência após escritas
+
+_trava_escrita = threading.Lock()  # Serializa as escritas das threads de um processo
+
+
+def _aplicar_pragmas(conexao_dbapi, registro_conexao, config, somente_leitura=False):
+    """
+    Ajusta cada conexão SQLite nova do pool com os PRAGMAs configurados.
+    Parâmetros:
+        conexao_dbapi (sqlite3.Connection): Conexão recém-aberta.
+        registro_conexao: Registro da conexão no pool (não utilizado).
+        config (Config): Configurações da aplicação.
+        somente_leitura (bool): Conexão aberta com mode=ro, que não pode mudar
+            o modo do journal (o arquivo já herda o WAL do banco principal).
+    """
+    cursor = conexao_dbapi.cursor()
+    if config["SQLITE_WAL"] and not somente_leitura:
+        cursor.execute("PRAGMA journal_mode=WAL")  # Leitores não bloqueiam escritores
+    cursor.execute(
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}"
+    )  # NORMAL é seguro com WAL e evita um fsync por commit
+    cursor.execute(f"PRAGMA cache_size=-{int(config['SQLITE_CACHE_KB'])}")  # Em KiB
+    cursor.execute(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_BYTES'])}")  # Leituras
+    cursor.execute(
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}"
+    )  # Espera o outro escritor em vez de falhar na hora
+    cursor.execute("PRAGMA temp_store=MEMORY")  # Tabelas temporárias em memória
+    cursor.close()
+
+
+def configurar_banco(app):
+    """
+    Registra os ajustes de conexão nos engines SQLite da aplicação.
+    Parâmetros:
+        app (Flask): Instância da aplicação, com o banco já inicializado.
+    """
+    app.config.setdefault("SQLITE_AJUSTES", True)
+    app.config.setdefault("SQLITE_WAL", True)
+    app.config.setdefault("SQLITE_SYNCHRONOUS", "NORMAL")
+    app.config.setdefault("SQLITE_CACHE_KB", 65536)
+    app.config.setdefault("SQLITE_MMAP_BYTES", 268435456)
+    app.config.setdefault("SQLITE_BUSY_TIMEOUT_MS", 5000)
+    app.config.setdefault("ESCRITA_TENTATIVAS", 5)
+    app.config.setdefault("ESCRITA_ESPERA_MS", 50)
+    app.config.setdefault("BANCO_LEITURA_CONSISTENCIA_SEGUNDOS", 5)
+    if not app.config["SQLITE_AJUSTES"]:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                somente_leitura = engine.url.query.get("mode") == "ro"  # Réplica
+                event.listen(
+                    engine,
+                    "connect",
+                    lambda conexao, registro, config=app.config, ro=somente_leitura: (
+                        _aplicar_pragmas(conexao, registro, config, ro)
+                    ),
+                )  # Aplica os PRAGMAs em cada conexão nova
+
+
+def _banco_travado(erro):
+    """
+    Verifica se um erro do banco indica que outro processo está escrevendo.
+    Parâmetros:
+        erro (OperationalError): Erro recebido do SQLAlchemy.
+    Retorna:
+        bool: True se a operação pode ser repetida.
+    """
+    mensagem = str(erro.orig).lower()
+    return "database is locked" in mensagem or "database is busy" in mensagem
+
+
+def escrever(aplicar):
+    """
+    Executa uma unidade de escrita e faz o commit, repetindo tudo se o SQLite
+    estiver travado por outro processo. As escritas das threads de um mesmo
+    processo são serializadas, e entre processos a espera fica a cargo do
+    busy_timeout; se ainda assim o banco continuar travado, a transação é
+    desfeita e 'aplicar' é executada de novo após uma espera crescente.
+    Parâmetros:
+        aplicar (Callable): Função que faz as alterações na sessão; pode ser
+            chamada mais de uma vez.
+    Retorna:
+        Any: Valor retornado pela última chamada de 'aplicar'.
+    """
+    config = current_app.config
+    tentativas = config["ESCRITA_TENTATIVAS"]
+    espera = config["ESCRITA_ESPERA_MS"] / 1000
+    for tentativa in range(1, tentativas + 1):
+        try:
+            with _trava_escrita:
+                resultado = aplicar()  # Faz as alterações na sessão
+                db.session.commit()  # Salva no banco
+            marcar_escrita()  # O usuário passa a ler do banco principal por um tempo
+            return resultado
+        except OperationalError as erro:
+            db.session.rollback()  # Desfaz a transação para poder repetir
+            if not _banco_travado(erro) or tentativa == tentativas:
+                raise
+            time.sleep(espera * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5))
+
+
+def incluir_no_esquema(nome, tipo, parentes):
+    """
+    Filtro do autogenerate das migrações: ignora a tabela de busca FTS5 e as
+    tabelas internas que o SQLite cria para ela, que não são modelos.
+    Parâmetros:
+        nome (str): Nome do objeto do banco.
+        tipo (str): Tipo do objeto ('table', 'index', etc.).
+        parentes (dict): Nomes dos objetos que contêm este.
+    Retorna:
+        bool: True se o objeto deve ser comparado com os modelos.
+    """
+    return not (tipo == "table" and nome.startswith("post_busca"))
@@ -0,0 +1,213 @@
+import re  # Importa expressões regulares para separar os termos da busca
+
+from markupsafe import Markup, escape  # Importa marcação HTML segura
+from sqlalchemy import DDL, and_, event, or_, text  # Importa DDL, filtros e SQL
+from sqlalchemy.orm import joinedload  # Importa carregamento antecipado de relações
+
+from app import db  # Importa a instância do banco de dados
+from app.models import Post  # Importa o modelo de post
+
+MARCA_INICIO = "\x02"  # Marca o início de um termo encontrado no texto do SQLite
+MARCA_FIM = "\x03"  # Marca o fim de um termo encontrado no texto do SQLite
+CRIAR_TABELA_BUSCA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS post_busca USING fts5("
+    "titulo, conteudo, tokenize='unicode61 remove_diacritics 2')"
+)  # Tabela FTS5 com título e conteúdo dos posts; o rowid é o ID do post
+
+INSERIR_BUSCA = text(
+    "INSERT INTO post_busca (rowid, titulo, conteudo) VALUES (:id, :titulo, :conteudo)"
+)  # Grava um post no índice de busca
+
+event.listen(
+    Post.__table__,
+    "after_create",
+    DDL(CRIAR_TABELA_BUSCA).execute_if(dialect="sqlite"),
+)  # Cria a tabela de busca junto com a tabela de posts (db.create_all), no SQLite
+
+
+def busca_textual():
+    """
+    Verifica se o banco da sessão atual tem o índice de busca textual (FTS5),
+    que só existe no SQLite. Nos outros bancos o índice não é mantido e a
+    busca compara os termos diretamente com os posts (veja buscar_posts).
+    Retorna:
+        bool: True se o banco é SQLite.
+    """
+    return db.session.get_bind().dialect.name == "sqlite"
+
+
+def indexar_post(post):
+    """
+    Grava (ou regrava) um post no índice de busca, na mesma transação do post.
+    O post precisa ter ID, então posts novos devem passar por um flush antes.
+    Parâmetros:
+        post (Post): Post a indexar.
+    """
+    if not busca_textual():
+        return  # Sem índice fora do SQLite
+    remover_post(post.id)  # Remove a versão anterior, se houver
+    db.session.execute(
+        INSERIR_BUSCA,
+        {"id": post.id, "titulo": post.titulo, "conteudo": post.conteudo},
+    )
+
+
+def indexar_posts(posts):
+    """
+    Grava vários posts novos no índice de busca em uma única instrução, na
+    mesma transação dos posts.
+    Parâmetros:
+        posts (list[dict]): ID, título e conteúdo de cada post.
+    """
+    if posts and busca_textual():
+        db.session.execute(INSERIR_BUSCA, posts)  # executemany
+
+
+def remover_post(post_id):
+    """
+    Remove um post do índice de busca.
+    Parâmetros:
+        post_id (int): ID do post.
+    """
+    if busca_textual():
+        db.session.execute(
+            text("DELETE FROM post_busca WHERE rowid = :id"), {"id": post_id}
+        )
+
+
+def reconstruir_indice():
+    """
+    Recria o índice de busca a partir da tabela de posts e o otimiza.
+    Retorna:
+        int: Quantidade de posts indexados (0 fora do SQLite, que não tem índice).
+    """
+    if not busca_textual():
+        return 0
+    db.session.execute(text("DROP TABLE IF EXISTS post_busca"))
+    db.session.execute(text(CRIAR_TABELA_BUSCA))
+    resultado = db.session.execute(
+        text(
+            "INSERT INTO post_busca (rowid, titulo, conteudo) "
+            "SELECT id, titulo, conteudo FROM post"
+        )
+    )  # Indexa todos os posts em uma única instrução
+    db.session.execute(
+        text("INSERT INTO post_busca (post_busca) VALUES ('optimize')")
+    )  # Junta os segmentos do índice para acelerar as buscas
+    db.session.commit()
+    return resultado.rowcount
+
+
+def montar_consulta(texto):
+    """
+    Converte o texto digitado em uma consulta FTS5 segura, exigindo todos os termos.
+    Cada termo vai entre aspas, então operadores digitados pelo usuário não quebram
+    a consulta.
+    Parâmetros:
+        texto (str): Texto digitado na busca.
+    Retorna:
+        str: Consulta no formato do FTS5 (vazia se não houver termos).
+    """
+    return " ".join(f'"{termo}"' for termo in re.findall(r"\w+", texto))
+
+
+def destacar(texto):
+    """
+    Escapa o texto retornado pelo SQLite e troca as marcas dos termos por <mark>.
+    Parâmetros:
+        texto (str): Texto com as marcas MARCA_INICIO e MARCA_FIM.
+    Retorna:
+        Markup: HTML seguro com os termos destacados.
+    """
+    return Markup(
+        str(escape(texto)).replace(MARCA_INICIO, "<mark>").replace(MARCA_FIM, "</mark>")
+    )
+
+
+def buscar_posts(texto, pagina, por_pagina):
+    """
+    Busca posts pelo título e conteúdo, ordenados por relevância (bm25).
+    Parâmetros:
+        texto (str): Texto digitado na busca.
+        pagina (int): Número da página, começando em 1.
+        por_pagina (int): Quantidade de resultados por página.
+    Retorna:
+        tuple[list[dict], bool]: Resultados da página (post, título e trecho
+            destacados) e se existe uma próxima página.
+    """
+    consulta = montar_consulta(texto)
+    if not consulta:
+        return [], False
+    if not busca_textual():
+        return _buscar_sem_indice(re.findall(r"\w+", texto), pagina, por_pagina)
+    linhas = db.session.execute(
+        text(
+            "SELECT rowid, highlight(post_busca, 0, :inicio, :fim), "
+            "snippet(post_busca, 1, :inicio, :fim, '…', 24) "
+            "FROM post_busca WHERE post_busca MATCH :consulta "
+            "ORDER BY rank LIMIT :limite OFFSET :deslocamento"
+        ),
+        {
+            "inicio": MARCA_INICIO,
+            "fim": MARCA_FIM,
+            "consulta": consulta,
+            "limite": por_pagina + 1,
+            "deslocamento": (pagina - 1) * por_pagina,
+        },
+    ).all()  # Busca um resultado a mais para saber se existe próxima página
+    tem_proxima = len(linhas) > por_pagina
+    linhas = linhas[:por_pagina]
+    posts = {
+        post.id: post
+        for post in Post.query.options(joinedload(Post.autor)).filter(
+            Post.id.in_([linha[0] for linha in linhas])
+        )
+    }  # Carrega os posts da página e seus autores em uma consulta
+    resultados = [
+        {"post": posts[post_id], "titulo": destacar(titulo), "trecho": destacar(trecho)}
+        for post_id, titulo, trecho in linhas
+        if post_id in posts
+    ]
+    return resultados, tem_proxima
+
+
+def _buscar_sem_indice(termos, pagina, por_pagina):
+    """
+    Busca posts sem o FTS5 (bancos que não são SQLite): exige que cada termo
+    apareça no título ou no conteúdo, sem diferenciar maiúsculas, e ordena do
+    mais novo para o mais antigo. Não há destaque dos termos.
+    Parâmetros:
+        termos (list[str]): Termos digitados.
+        pagina (int): Número da página, começando em 1.
+        por_pagina (int): Quantidade de resultados por página.
+    Retorna:
+        tuple[list[dict], bool]: Resultados da página e se existe uma próxima.
+    """
+    filtros = []
+    for termo in termos:
+        padrao = "%" + termo.replace("_", "\\_") + "%"  # '_' é curinga no LIKE
+        filtros.append(
+            or_(
+                Post.titulo.ilike(padrao, escape="\\"),
+                Post.conteudo.ilike(padrao, escape="\\"),
+            )
+        )
+    posts = (
+        Post.query.options(joinedload(Post.autor))
+        .filter(and_(*filtros))
+        .order_by(Post.id.desc())
+        .limit(por_pagina + 1)
+        .offset((pagina - 1) * por_pagina)
+        .all()
+    )  # Busca um resultado a mais para saber se existe próxima página
+    resultados = [
+        {
+            "post": post,
+            "titulo": escape(post.titulo),
+            "trecho": escape(
+                post.conteudo[:150] + ("…" if len(post.conteudo) > 150 else "")
+            ),
+        }
+        for post in posts[:por_pagina]
+    ]
+    return resultados, len(posts) > por_pagina
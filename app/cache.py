@@ -0,0 +1,447 @@
+import os  # Importa módulo para manipulação de caminhos e diretórios
+import secrets  # Importa módulo para geração de tokens aleatórios
+import sqlite3  # Importa o driver SQLite usado pelo backend em arquivo
+import threading  # Importa primitivas de sincronização entre threads
+import time  # Importa funções de tempo para ordenar os acessos
+from collections import OrderedDict  # Importa dicionário ordenado usado como LRU
+
+from flask import current_app  # Importa a aplicação da requisição atual
+from markupsafe import Markup  # Importa marcação HTML segura para os fragmentos
+
+from app.leitura import usando_banco_leitura  # Importa o roteamento das leituras
+
+
+class BackendMemoria:
+    """
+    Backend de cache em memória do processo, com descarte LRU (menos usado
+    recentemente) quando a quantidade de chaves passa do limite e, opcionalmente,
+    expiração das chaves após 'ttl' segundos.
+    """
+
+    def __init__(self, limite=1000, ttl=None):
+        self.limite = limite  # Quantidade máxima de chaves
+        self.ttl = ttl  # Segundos até uma chave expirar (None: não expira)
+        self._dados = OrderedDict()  # Chave -> (momento de expiração, valor)
+        self._trava = threading.Lock()  # Protege o dicionário entre threads
+
+    def obter_varios(self, chaves):
+        """
+        Busca várias chaves de uma vez, marcando-as como usadas recentemente.
+        Parâmetros:
+            chaves (list[str]): Chaves buscadas.
+        Retorna:
+            dict[str, str]: Valores encontrados, indexados pela chave.
+        """
+        encontrados = {}
+        agora = time.monotonic()
+        with self._trava:
+            for chave in chaves:
+                if chave in self._dados:
+                    expira, valor = self._dados[chave]
+                    if expira is not None and expira <= agora:
+                        del self._dados[chave]  # Chave expirada
+                        continue
+                    self._dados.move_to_end(chave)  # Marca como usada recentemente
+                    encontrados[chave] = valor
+        return encontrados
+
+    def definir_varios(self, valores):
+        """
+        Grava várias chaves de uma vez, descartando as menos usadas se necessário.
+        Parâmetros:
+            valores (dict[str, str]): Valores a gravar, indexados pela chave.
+        """
+        expira = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._trava:
+            for chave, valor in valores.items():
+                self._dados[chave] = (expira, valor)
+                self._dados.move_to_end(chave)
+            while len(self._dados) > self.limite:
+                self._dados.popitem(last=False)  # Descarta a chave menos usada
+
+    def apagar(self, chave):
+        """
+        Remove uma chave do cache, se existir.
+        Parâmetros:
+            chave (str): Chave a remover.
+        """
+        with self._trava:
+            self._dados.pop(chave, None)
+
+
+class BackendSQLite:
+    """
+    Backend de cache em um arquivo SQLite local, compartilhado entre os processos
+    da mesma máquina. Guarda o momento do último acesso de cada chave (ou, sem
+    'registrar_acesso', só o da gravação, para que as leituras nunca escrevam no
+    arquivo) e descarta as mais antigas quando a quantidade passa do limite.
+    Erros do SQLite (arquivo travado ou ilegível) não interrompem a página: a
+    leitura conta como ausência no cache e a gravação é descartada.
+    """
+
+    INTERVALO_DESCARTE = 100  # Gravações entre duas verificações do limite
+
+    def __init__(
+        self, caminho, limite=10000, tabela="fragmento", registrar_acesso=True
+    ):
+        self.caminho = caminho  # Caminho do arquivo do cache
+        self.limite = limite  # Quantidade máxima de chaves
+        self.tabela = tabela  # Tabela das chaves no arquivo
+        self.registrar_acesso = registrar_acesso  # Leituras atualizam o acesso
+        self._local = threading.local()  # Uma conexão por thread
+        self._gravacoes = 0  # Gravações desde a última verificação do limite
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)  # Garante que a pasta existe
+        with self._conexao() as conexao:
+            conexao.execute(
+                f"CREATE TABLE IF NOT EXISTS {tabela} ("
+                "chave TEXT PRIMARY KEY, valor TEXT NOT NULL, acesso REAL NOT NULL)"
+            )
+            conexao.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{tabela}_acesso ON {tabela} (acesso)"
+            )
+
+    def _conexao(self):
+        """
+        Retorna a conexão SQLite da thread atual, abrindo-a na primeira vez.
+        Retorna:
+            sqlite3.Connection: Conexão com o arquivo do cache.
+        """
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None or self._local.pid != os.getpid():
+            # Abre uma conexão nova também depois de um fork (gunicorn --preload)
+            conexao = sqlite3.connect(self.caminho, timeout=5)
+            conexao.execute("PRAGMA journal_mode=WAL")  # Leitores não bloqueiam
+            conexao.execute("PRAGMA synchronous=OFF")  # Cache pode ser perdido
+            self._local.conexao = conexao
+            self._local.pid = os.getpid()
+        return conexao
+
+    def _falha(self, operacao, erro):
+        current_app.logger.warning(
+            "Cache SQLite %s indisponível (%s): %s", self.caminho, operacao, erro
+        )
+
+    def obter_varios(self, chaves):
+        """
+        Busca várias chaves de uma vez, atualizando o momento do último acesso
+        (se registrar_acesso).
+        Parâmetros:
+            chaves (list[str]): Chaves buscadas.
+        Retorna:
+            dict[str, str]: Valores encontrados, indexados pela chave (vazio se o
+                arquivo não puder ser lido).
+        """
+        if not chaves:
+            return {}
+        marcadores = ",".join("?" * len(chaves))
+        try:
+            conexao = self._conexao()
+            encontrados = dict(
+                conexao.execute(
+                    f"SELECT chave, valor FROM {self.tabela} "
+                    f"WHERE chave IN ({marcadores})",
+                    list(chaves),
+                )
+            )
+        except sqlite3.Error as erro:
+            self._falha("leitura", erro)
+            return {}  # Como se nada estivesse no cache
+        if encontrados and self.registrar_acesso:
+            try:
+                with conexao:
+                    conexao.executemany(
+                        f"UPDATE {self.tabela} SET acesso = ? WHERE chave = ?",
+                        [(time.time(), chave) for chave in encontrados],
+                    )  # Marca as chaves como usadas recentemente
+            except sqlite3.Error as erro:
+                self._falha("acesso", erro)  # Só afeta a ordem do descarte
+        return encontrados
+
+    def definir_varios(self, valores):
+        """
+        Grava várias chaves de uma vez e, periodicamente, descarta as mais antigas.
+        Parâmetros:
+            valores (dict[str, str]): Valores a gravar, indexados pela chave.
+        """
+        if not valores:
+            return
+        agora = time.time()
+        try:
+            conexao = self._conexao()
+            with conexao:
+                conexao.executemany(
+                    f"INSERT OR REPLACE INTO {self.tabela} (chave, valor, acesso) "
+                    "VALUES (?, ?, ?)",
+                    [(chave, valor, agora) for chave, valor in valores.items()],
+                )
+                self._gravacoes += len(valores)
+                if self._gravacoes >= self.INTERVALO_DESCARTE:
+                    self._gravacoes = 0
+                    conexao.execute(
+                        f"DELETE FROM {self.tabela} WHERE chave IN ("
+                        f"SELECT chave FROM {self.tabela} ORDER BY acesso LIMIT "
+                        f"max(0, (SELECT count(*) FROM {self.tabela}) - ?))",
+                        (self.limite,),
+                    )  # Descarta as chaves acessadas há mais tempo
+        except sqlite3.Error as erro:
+            self._falha("gravação", erro)
+
+    def apagar(self, chave):
+        """
+        Remove uma chave do cache, se existir.
+        Parâmetros:
+            chave (str): Chave a remover.
+        """
+        try:
+            with self._conexao() as conexao:
+                conexao.execute(f"DELETE FROM {self.tabela} WHERE chave = ?", (chave,))
+        except sqlite3.Error as erro:
+            self._falha("remoção", erro)
+
+
+class CacheFragmentos:
+    """
+    Cache de trechos de HTML já renderizados (cards de posts e de usuários).
+    Cada objeto tem uma versão; a chave de um fragmento inclui as versões de
+    tudo de que ele depende, então invalidar um objeto é só trocar a sua versão,
+    e os fragmentos antigos deixam de ser encontrados até serem descartados pelo
+    LRU. As versões ficam, por padrão, em um arquivo SQLite compartilhado por
+    todos os processos da máquina (workers do gunicorn e comandos), de modo que
+    uma invalidação feita em um processo vale para os fragmentos de todos; como
+    consultá-las não escreve no arquivo, as mais antigas são descartadas pela
+    ordem de gravação, e uma versão descartada só gera fragmentos novos.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configura os backends dos fragmentos e das versões a partir das
+        configurações da aplicação.
+        Parâmetros:
+            app (Flask): Instância da aplicação.
+        """
+        app.config.setdefault("CACHE_FRAGMENTOS_BACKEND", "memoria")
+        app.config.setdefault("CACHE_FRAGMENTOS_VERSOES", "sqlite")
+        app.config.setdefault("CACHE_FRAGMENTOS_LIMITE", 5000)
+        app.config.setdefault("CACHE_FRAGMENTOS_ESPERA_SEGUNDOS", 2)
+        app.config.setdefault(
+            "CACHE_FRAGMENTOS_CAMINHO", os.path.join(app.instance_path, "fragmentos.db")
+        )
+        tipo = app.config["CACHE_FRAGMENTOS_BACKEND"]
+        tipo_versoes = app.config["CACHE_FRAGMENTOS_VERSOES"]
+        limite = app.config["CACHE_FRAGMENTOS_LIMITE"]
+        caminho = app.config["CACHE_FRAGMENTOS_CAMINHO"]
+        if tipo == "memoria":
+            backend = BackendMemoria(limite)
+        elif tipo == "sqlite":
+            backend = BackendSQLite(caminho, limite)
+        else:
+            raise ValueError(f"Backend de cache de fragmentos desconhecido: {tipo}")
+        if tipo_versoes == "sqlite":
+            versoes = BackendSQLite(
+                caminho, limite, tabela="versao", registrar_acesso=False
+            )  # Compartilhado entre processos; consultar uma versão não escreve
+        elif tipo == "memoria":
+            versoes = backend  # Fragmentos e versões no mesmo LRU em memória
+        else:
+            # Versões em memória com fragmentos compartilhados ficariam desatualizadas
+            raise ValueError(f"Backend de versões inválido: {tipo_versoes}")
+        app.extensions["cache_fragmentos"] = backend  # Cada aplicação tem o seu
+        app.extensions["cache_fragmentos_versoes"] = versoes
+
+    @property
+    def backend(self):
+        """
+        Backend de cache dos fragmentos da aplicação atual.
+        """
+        return current_app.extensions["cache_fragmentos"]
+
+    @property
+    def backend_versoes(self):
+        """
+        Backend de cache das versões dos objetos da aplicação atual.
+        """
+        return current_app.extensions["cache_fragmentos_versoes"]
+
+    @staticmethod
+    def _chave_versao(tipo, id_objeto):
+        return f"versao:{tipo}:{id_objeto}"
+
+    def versoes(self, dependencias):
+        """
+        Busca as versões atuais de vários objetos, criando as que ainda não existem.
+        Uma versão ausente (nunca criada ou descartada pelo LRU) recebe um valor
+        aleatório novo, o que nunca reaproveita fragmentos antigos.
+        Parâmetros:
+            dependencias (set[tuple[str, int]]): Pares (tipo, id) dos objetos.
+        Retorna:
+            dict[tuple[str, int], str]: Versão de cada objeto.
+        """
+        chaves = {self._chave_versao(*dep): dep for dep in dependencias}
+        encontradas = self.backend_versoes.obter_varios(list(chaves))
+        novas = {
+            chave: secrets.token_hex(6) for chave in chaves if chave not in encontradas
+        }  # Versões iniciais dos objetos ainda sem versão
+        self.backend_versoes.definir_varios(novas)
+        encontradas.update(novas)
+        return {dep: encontradas[chave] for chave, dep in chaves.items()}
+
+    def invalidar(self, tipo, id_objeto):
+        """
+        Invalida todos os fragmentos que dependem de um objeto.
+        Parâmetros:
+            tipo (str): Tipo do objeto ('post' ou 'usuario').
+            id_objeto (int): ID do objeto.
+        """
+        versao = f"{secrets.token_hex(6)}-{int(time.time())}"  # Com o momento
+        self.backend_versoes.definir_varios(
+            {self._chave_versao(tipo, id_objeto): versao}
+        )  # Vale para todos os processos que compartilham as versões
+
+    @staticmethod
+    def _gravaveis(novos, deps_por_chave, versoes):
+        """
+        Filtra os fragmentos novos que podem ser gravados. As versões são lidas
+        depois dos dados, então um objeto alterado entre as duas leituras vem
+        na versão antiga, e o fragmento antigo ficaria no cache com a versão
+        nova; com o banco de leitura, que pode estar atrasado, essa janela é
+        ainda maior. Por isso só são gravados os fragmentos cujas dependências
+        não mudaram nos últimos CACHE_FRAGMENTOS_ESPERA_SEGUNDOS (ou
+        BANCO_LEITURA_CONSISTENCIA_SEGUNDOS, se maior, com o banco de leitura).
+        Parâmetros:
+            novos (dict[str, str]): Chave -> HTML dos fragmentos renderizados.
+            deps_por_chave (dict[str, list]): Dependências de cada chave.
+            versoes (dict[tuple[str, int], str]): Versão de cada objeto.
+        Retorna:
+            dict[str, str]: Fragmentos que podem ser gravados.
+        """
+        config = current_app.config
+        espera = config["CACHE_FRAGMENTOS_ESPERA_SEGUNDOS"]
+        if usando_banco_leitura():
+            espera = max(espera, config["BANCO_LEITURA_CONSISTENCIA_SEGUNDOS"])
+        limite = time.time() - espera
+        return {
+            chave: html
+            for chave, html in novos.items()
+            if all(
+                int(versoes[dep].partition("-")[2] or 0) <= limite
+                for dep in deps_por_chave[chave]
+            )  # Versões sem momento são anteriores a qualquer alteração
+        }
+
+    def renderizar(self, template, itens, nome, dependencias):
+        """
+        Renderiza um fragmento de template para cada item, reaproveitando os que
+        já estão no cache e gravando de uma só vez os que precisaram ser gerados.
+        Parâmetros:
+            template (str): Nome do template do fragmento.
+            itens (list): Itens a renderizar.
+            nome (str): Nome da variável que recebe o item no template.
+            dependencias (Callable): Função que recebe um item e retorna a lista
+                de pares (tipo, id) dos objetos que o fragmento exibe.
+        Retorna:
+            list[Markup]: HTML de cada item, na mesma ordem.
+        """
+        deps_itens = [dependencias(item) for item in itens]
+        versoes = self.versoes({dep for deps in deps_itens for dep in deps})
+        chaves = [
+            f"{template}:" + ":".join(f"{t}{i}.{versoes[(t, i)]}" for t, i in deps)
+            for deps in deps_itens
+        ]  # Chave de cada fragmento com as versões das suas dependências
+        encontrados = self.backend.obter_varios(chaves)
+        novos = {}
+        modelo = None
+        for item, chave in zip(itens, chaves):
+            if chave not in encontrados and chave not in novos:
+                if modelo is None:
+                    modelo = current_app.jinja_env.get_template(template)
+                novos[chave] = modelo.render({nome: item})  # Renderiza o que faltou
+        self.backend.definir_varios(
+            self._gravaveis(novos, dict(zip(chaves, deps_itens)), versoes)
+        )
+        encontrados.update(novos)
+        return [Markup(encontrados[chave]) for chave in chaves]
+
+
+class CacheUsuarios:
+    """
+    Cache curto, em memória do processo, dos dados dos usuários carregados pelo
+    Flask-Login a cada requisição autenticada. As entradas expiram após
+    USUARIOS_CACHE_SEGUNDOS, o que limita o tempo em que outro processo pode ver
+    dados antigos; no processo que altera o usuário a entrada é invalidada na hora.
+    """
+
+    def __init__(self, app=None):
+        self._contadores = {"acertos": 0, "falhas": 0}  # Acertos e falhas do cache
+        self._trava = threading.Lock()  # Protege os contadores entre threads
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configura o tamanho e a validade do cache a partir da aplicação.
+        Parâmetros:
+            app (Flask): Instância da aplicação.
+        """
+        app.config.setdefault("USUARIOS_CACHE_LIMITE", 1000)
+        app.config.setdefault("USUARIOS_CACHE_SEGUNDOS", 30)
+        app.extensions["cache_usuarios"] = BackendMemoria(
+            app.config["USUARIOS_CACHE_LIMITE"], app.config["USUARIOS_CACHE_SEGUNDOS"]
+        )  # Cada aplicação tem o seu
+
+    @property
+    def backend(self):
+        """
+        Backend de cache da aplicação atual.
+        """
+        return current_app.extensions["cache_usuarios"]
+
+    def obter(self, usuario_id):
+        """
+        Busca os dados de um usuário no cache.
+        Parâmetros:
+            usuario_id (int): ID do usuário.
+        Retorna:
+            dict | None: Valores das colunas do usuário, ou None se não estiver no cache.
+        """
+        valores = self.backend.obter_varios([usuario_id]).get(usuario_id)
+        with self._trava:
+            self._contadores["acertos" if valores is not None else "falhas"] += 1
+        return valores
+
+    def guardar(self, usuario_id, valores):
+        """
+        Guarda os dados de um usuário no cache.
+        Parâmetros:
+            usuario_id (int): ID do usuário.
+            valores (dict): Valores das colunas do usuário.
+        """
+        self.backend.definir_varios({usuario_id: valores})
+
+    def invalidar(self, usuario_id):
+        """
+        Remove um usuário do cache, após uma alteração ou logout.
+        Parâmetros:
+            usuario_id (int): ID do usuário.
+        """
+        self.backend.apagar(usuario_id)
+
+    def contadores(self):
+        """
+        Retorna os acertos e falhas do cache neste processo e a taxa de acertos.
+        Retorna:
+            dict: Acertos, falhas e taxa de acertos (entre 0 e 1).
+        """
+        with self._trava:
+            acertos, falhas = self._contadores["acertos"], self._contadores["falhas"]
+        total = acertos + falhas
+        return {
+            "acertos": acertos,
+            "falhas": falhas,
+            "taxa_acertos": acertos / total if total else 0.0,
+        }
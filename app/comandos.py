@@ -0,0 +1,202 @@
+import os  # Importa módulo para manipulação de caminhos e diretórios
+import sqlite3  # Importa a cópia online (backup) de bancos SQLite
+import time  # Importa funções de tempo (taxa da importação e intervalo da cópia)
+
+import click  # Importa biblioteca usada pelos comandos de linha de comando do Flask
+from flask import current_app  # Importa a aplicação do comando atual
+from flask.cli import with_appcontext  # Executa os comandos dentro da aplicação
+
+from app import db, estaticos  # Importa o banco de dados e os arquivos estáticos
+from app.busca import (  # Importa a reconstrução do índice de busca
+    busca_textual,
+    reconstruir_indice,
+)
+from app.estaticos import brotli  # Importa o brotli, se estiver instalado
+from app.imagens import (  # Importa funções de armazenamento das imagens
+    FOTO_PADRAO,
+    arquivos_imagem,
+    pasta_imagens,
+    recente,
+)
+from app.importacao import (  # Importa a importação em lote
+    ErroImportacao,
+    inserir_posts,
+    inserir_usuarios,
+    ler_registros,
+)
+from app.leitura import BIND_LEITURA  # Importa a chave do banco de leitura
+from app.models import Usuario  # Importa o modelo de usuário
+
+
+@click.command("limpar-imagens")
+@with_appcontext
+def limpar_imagens():
+    """
+    Apaga da pasta de imagens os arquivos que nenhum usuário referencia mais,
+    como fotos substituídas antes da deduplicação por conteúdo. Arquivos
+    gravados há menos de IMAGENS_CARENCIA_SEGUNDOS são mantidos, pois podem
+    pertencer a um envio ainda não salvo no banco.
+    """
+    caminho_pasta = pasta_imagens()  # Caminho da pasta de imagens
+    em_uso = {FOTO_PADRAO}
+    for (nome,) in db.session.query(Usuario.foto_perfil).distinct():
+        if nome:
+            em_uso.update(arquivos_imagem(nome))  # Arquivos ainda referenciados
+    removidos = 0
+    for nome_arquivo in os.listdir(caminho_pasta):
+        if nome_arquivo.endswith(".tmp"):
+            continue  # Variante ainda sendo gravada
+        caminho_arquivo = os.path.join(caminho_pasta, nome_arquivo)
+        if nome_arquivo not in em_uso and not recente(caminho_arquivo):
+            os.remove(caminho_arquivo)  # Arquivo órfão
+            removidos += 1
+    click.echo(f"{removidos} arquivo(s) de imagem removido(s).")
+
+
+@click.command("reconstruir-busca")
+@with_appcontext
+def reconstruir_busca():
+    """
+    Recria o índice de busca textual (FTS5) a partir de todos os posts.
+    As migrações já criam e preenchem o índice; use para corrigi-lo.
+    """
+    if not busca_textual():
+        click.echo("A busca textual (FTS5) só existe no SQLite; nada a reconstruir.")
+        return
+    total = reconstruir_indice()  # Recria e preenche o índice
+    click.echo(f"{total} post(s) indexado(s) para busca.")
+
+
+@click.command("gerar-estaticos")
+@with_appcontext
+def gerar_estaticos():
+    """
+    Gera as cópias dos arquivos estáticos versionadas pelo conteúdo e as suas
+    variantes pré-comprimidas (gzip e, com o pacote 'brotli', brotli).
+    Execute a cada deploy, antes de iniciar a aplicação.
+    """
+    manifesto = estaticos.gerar()  # Versiona, comprime e grava o manifesto
+    click.echo(f"{len(manifesto)} arquivo(s) estático(s) versionado(s).")
+    if brotli is None:
+        click.echo("Pacote 'brotli' não instalado: geradas apenas as variantes gzip.")
+
+
+def _importar(inserir, caminho, formato, **opcoes):
+    """
+    Executa uma importação em lote mostrando o progresso após cada transação.
+    Parâmetros:
+        inserir (Callable): inserir_usuarios ou inserir_posts.
+        caminho (str): Arquivo JSONL ou CSV.
+        formato (str | None): 'jsonl' ou 'csv' (None: pela extensão).
+        **opcoes: Opções repassadas para 'inserir'.
+    """
+    inicio = time.perf_counter()
+
+    def progresso(importados, ignorados):
+        taxa = importados / max(time.perf_counter() - inicio, 1e-9)
+        click.echo(
+            f"{importados} importado(s), {ignorados} ignorado(s) ({taxa:.0f}/s)"
+        )
+
+    try:
+        importados, ignorados = inserir(
+            ler_registros(caminho, formato), progresso=progresso, **opcoes
+        )
+    except ErroImportacao as erro:
+        raise click.ClickException(
+            f"{erro}. Os lotes anteriores já foram salvos: corrija o arquivo e "
+            "importe de novo (usuários e posts com ID já importados são ignorados)."
+        )
+    click.echo(
+        f"Concluído: {importados} importado(s) e {ignorados} ignorado(s) em "
+        f"{time.perf_counter() - inicio:.1f} s."
+    )
+    if importados and current_app.config["CACHE_FRAGMENTOS_VERSOES"] != "sqlite":
+        click.echo(
+            "Aviso: com CACHE_FRAGMENTOS_VERSOES=memoria os workers em execução "
+            "não veem a importação nos cards em cache; reinicie-os."
+        )  # As versões deste processo não chegam aos outros
+
+
+@click.command("importar-usuarios")
+@click.argument("caminho", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--formato", type=click.Choice(["jsonl", "csv"]), help="Padrão: pela extensão."
+)
+@click.option(
+    "--lote", default=5000, show_default=True, help="Usuários por transação."
+)
+@click.option(
+    "--custo-senha",
+    type=click.IntRange(4, 31),
+    help="Custo do bcrypt das senhas em texto (padrão: BCRYPT_LOG_ROUNDS).",
+)
+@with_appcontext
+def importar_usuarios(caminho, formato, lote, custo_senha):
+    """
+    Importa usuários de um arquivo JSONL ou CSV (campos username, email, senha
+    e, opcionalmente, id, foto_perfil e cursos) em lotes. E-mails já
+    cadastrados são ignorados.
+    """
+    _importar(inserir_usuarios, caminho, formato, lote=lote, custo_senha=custo_senha)
+
+
+@click.command("importar-posts")
+@click.argument("caminho", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--formato", type=click.Choice(["jsonl", "csv"]), help="Padrão: pela extensão."
+)
+@click.option("--lote", default=5000, show_default=True, help="Posts por transação.")
+@with_appcontext
+def importar_posts(caminho, formato, lote):
+    """
+    Importa posts de um arquivo JSONL ou CSV (campos titulo, conteudo e
+    usuario_id ou email_autor e, opcionalmente, id, data_postagem e
+    data_edicao) em lotes, já indexados para a busca. Posts com ID já
+    existente são ignorados.
+    """
+    _importar(inserir_posts, caminho, formato, lote=lote)
+
+
+@click.command("sincronizar-leitura")
+@click.option(
+    "--intervalo",
+    type=float,
+    help="Repete a cópia a cada N segundos, simulando uma réplica atrasada.",
+)
+@with_appcontext
+def sincronizar_leitura(intervalo):
+    """
+    Copia o banco principal para o banco de leitura quando os dois são
+    arquivos SQLite, para testar localmente o roteamento das leituras (em
+    produção, a réplica é mantida pelo próprio banco).
+    """
+    principal, leitura = db.engines[None], db.engines.get(BIND_LEITURA)
+    if leitura is None or {principal.dialect.name, leitura.dialect.name} != {"sqlite"}:
+        raise click.ClickException(
+            "Defina DATABASE_URL e BANCO_LEITURA_URL com dois arquivos SQLite."
+        )
+    caminho = leitura.url.database
+    if leitura.url.query.get("uri"):
+        caminho = caminho.removeprefix("file:")  # URL com ?mode=ro&uri=true
+    while True:
+        with principal.connect() as conexao:
+            copia = sqlite3.connect(caminho)  # Escrita, mesmo se o pool for mode=ro
+            try:
+                conexao.connection.dbapi_connection.backup(copia)  # Cópia consistente
+            finally:
+                copia.close()
+        click.echo(f"Banco de leitura atualizado ({time.strftime('%H:%M:%S')}).")
+        if not intervalo:
+            return
+        time.sleep(intervalo)
+
+
+COMANDOS = [
+    limpar_imagens,
+    reconstruir_busca,
+    gerar_estaticos,
+    importar_usuarios,
+    importar_posts,
+    sincronizar_leitura,
+]  # Registrados em create_app
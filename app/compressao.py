@@ -0,0 +1,194 @@
+import gzip  # Importa a compressão gzip das respostas inteiras
+import hashlib  # Importa funções de hash para a chave do cache
+import threading  # Importa primitivas de sincronização entre threads
+import zlib  # Importa a compressão gzip incremental das respostas em streaming
+
+from flask import current_app, request  # Importa funções do Flask
+
+from app.cache import BackendMemoria  # Importa o cache em memória com LRU
+
+try:
+    import brotli  # Opcional: sem ele as respostas são comprimidas só com gzip
+except ImportError:
+    brotli = None
+
+
+def _compressor(codificacao, config):
+    """
+    Cria um compressor incremental para respostas em streaming.
+    Parâmetros:
+        codificacao (str): 'br' ou 'gzip'.
+        config (Config): Configurações da aplicação.
+    Retorna:
+        tuple[Callable, Callable]: Funções que comprimem um pedaço (devolvendo o
+            que já pode ser enviado) e que finalizam o fluxo.
+    """
+    if codificacao == "br":
+        compressor = brotli.Compressor(quality=config["COMPRESSAO_NIVEL_BROTLI"])
+        return (
+            lambda pedaco: compressor.process(pedaco) + compressor.flush(),
+            compressor.finish,
+        )
+    compressor = zlib.compressobj(
+        config["COMPRESSAO_NIVEL_GZIP"], zlib.DEFLATED, 31
+    )  # 31: formato gzip (cabeçalho e CRC), não só deflate
+    return (
+        lambda pedaco: compressor.compress(pedaco)
+        + compressor.flush(zlib.Z_SYNC_FLUSH),
+        compressor.flush,
+    )
+
+
+def _comprimir_fluxo(pedacos, original, codificacao, config):
+    """
+    Comprime uma resposta em streaming pedaço a pedaço. Cada pedaço é enviado
+    assim que comprimido (flush), então o navegador continua recebendo o
+    começo da página antes do fim.
+    Parâmetros:
+        pedacos (Iterator[bytes]): Pedaços do corpo original.
+        original (Iterable): Corpo original da resposta, encerrado no fim.
+        codificacao (str): 'br' ou 'gzip'.
+        config (Config): Configurações da aplicação.
+    Retorna:
+        Iterator[bytes]: Pedaços comprimidos.
+    """
+    comprimir, finalizar = _compressor(codificacao, config)
+    try:
+        for pedaco in pedacos:
+            if pedaco:
+                yield comprimir(pedaco)
+        yield finalizar()
+    finally:
+        if hasattr(original, "close"):
+            original.close()  # Encerra o gerador (e o contexto) da página
+
+
+class Compressao:
+    """
+    Compressão das respostas dinâmicas (HTML, JSON e texto) com brotli, quando
+    o pacote está instalado e o navegador aceita, ou gzip. Respostas menores
+    que COMPRESSAO_MINIMO_BYTES vão sem compressão, pois o ganho não paga o
+    custo. Respostas em streaming são comprimidas pedaço a pedaço. Como muitas
+    páginas se repetem byte a byte (páginas estáticas, listagens montadas do
+    cache de cards, API), os corpos comprimidos ficam em um cache LRU indexado
+    pelo hash do conteúdo, e uma página repetida não é comprimida de novo.
+    Arquivos enviados com send_file (estáticos e fotos) não passam por aqui.
+    """
+
+    def __init__(self, app=None):
+        self._contadores = {
+            "acertos": 0,
+            "falhas": 0,
+            "bytes_originais": 0,
+            "bytes_enviados": 0,
+        }  # Cache de corpos comprimidos e bytes economizados neste processo
+        self._trava = threading.Lock()  # Protege os contadores entre threads
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Liga a compressão à aplicação, se estiver ativada nas configurações.
+        Parâmetros:
+            app (Flask): Instância da aplicação.
+        """
+        app.config.setdefault("COMPRESSAO_ATIVA", True)
+        app.config.setdefault("COMPRESSAO_MINIMO_BYTES", 500)
+        app.config.setdefault("COMPRESSAO_NIVEL_GZIP", 6)
+        app.config.setdefault("COMPRESSAO_NIVEL_BROTLI", 4)
+        app.config.setdefault("COMPRESSAO_CACHE_LIMITE", 256)
+        app.config.setdefault(
+            "COMPRESSAO_TIPOS",
+            ("text/html", "application/json", "text/plain", "text/css"),
+        )
+        if not app.config["COMPRESSAO_ATIVA"]:
+            return
+        app.extensions["compressao"] = BackendMemoria(
+            app.config["COMPRESSAO_CACHE_LIMITE"]
+        )  # Cada aplicação tem o seu
+        app.after_request(self._comprimir)
+
+    def _contar(self, **valores):
+        with self._trava:
+            for nome, valor in valores.items():
+                self._contadores[nome] += valor
+
+    def _comprimir(self, resposta):
+        config = current_app.config
+        if (
+            resposta.status_code < 200
+            or resposta.status_code in (204, 206, 304)
+            or resposta.direct_passthrough  # Arquivo do send_file
+            or "Content-Encoding" in resposta.headers
+            or resposta.mimetype not in config["COMPRESSAO_TIPOS"]
+            or "no-transform" in resposta.headers.get("Cache-Control", "")
+        ):
+            return resposta
+        resposta.vary.add("Accept-Encoding")  # A resposta muda com o cabeçalho
+        aceitas = request.accept_encodings
+        if brotli is not None and aceitas["br"]:
+            codificacao = "br"
+        elif aceitas["gzip"]:
+            codificacao = "gzip"
+        else:
+            return resposta  # O cliente não aceita compressão
+        if resposta.is_streamed:
+            resposta.response = _comprimir_fluxo(
+                resposta.iter_encoded(), resposta.response, codificacao, config
+            )
+            resposta.headers.pop("Content-Length", None)  # Tamanho desconhecido
+        else:
+            corpo = resposta.get_data()
+            if len(corpo) < config["COMPRESSAO_MINIMO_BYTES"]:
+                return resposta
+            resposta.set_data(self._comprimir_corpo(corpo, codificacao, resposta))
+        resposta.content_encoding = codificacao
+        etag, fraco = resposta.get_etag()
+        if etag and not fraco:
+            resposta.set_etag(etag, weak=True)  # Os bytes mudaram, o conteúdo não
+        return resposta
+
+    def _comprimir_corpo(self, corpo, codificacao, resposta):
+        """
+        Comprime uma resposta inteira, reaproveitando o resultado de um corpo
+        idêntico já comprimido. Páginas que não podem ser guardadas (com
+        mensagens flash) não entram no cache.
+        Parâmetros:
+            corpo (bytes): Corpo original.
+            codificacao (str): 'br' ou 'gzip'.
+            resposta (Response): Resposta sendo comprimida.
+        Retorna:
+            bytes: Corpo comprimido.
+        """
+        config = current_app.config
+        cache = current_app.extensions["compressao"]
+        guardar = not resposta.cache_control.no_store
+        chave = f"{codificacao}:{hashlib.sha1(corpo).hexdigest()}"
+        comprimido = cache.obter_varios([chave]).get(chave) if guardar else None
+        if comprimido is not None:
+            self._contar(acertos=1)
+        else:
+            if codificacao == "br":
+                comprimido = brotli.compress(
+                    corpo, quality=config["COMPRESSAO_NIVEL_BROTLI"]
+                )
+            else:
+                comprimido = gzip.compress(
+                    corpo, compresslevel=config["COMPRESSAO_NIVEL_GZIP"], mtime=0
+                )
+            if guardar:
+                cache.definir_varios({chave: comprimido})
+                self._contar(falhas=1)
+        self._contar(bytes_originais=len(corpo), bytes_enviados=len(comprimido))
+        return comprimido
+
+    def contadores(self):
+        """
+        Retorna os acertos e falhas do cache de corpos comprimidos e os bytes
+        antes e depois da compressão neste processo (sem as respostas em
+        streaming, cujo tamanho final não é conhecido aqui).
+        Retorna:
+            dict: Acertos, falhas, bytes originais e bytes enviados.
+        """
+        with self._trava:
+            return dict(self._contadores)
@@ -0,0 +1,153 @@
+import hashlib  # Importa funções de hash para montar os ETags
+from datetime import timezone  # Importa o fuso UTC das datas do banco
+
+from flask import (  # Importa funções do Flask
+    current_app,
+    make_response,
+    render_template,
+    request,
+    session,
+)
+from flask_login import current_user  # Importa o usuário da requisição
+from sqlalchemy import func, select  # Importa funções SQL e consultas
+
+from app import db  # Importa a instância do banco de dados
+from app.models import Post, Usuario  # Importa os modelos
+
+
+def versao_dados():
+    """
+    Busca, em uma única consulta atendida por índices, a versão atual dos dados
+    exibidos nas listagens: o maior ID de post (posts novos), a última edição
+    de post e a última alteração de usuário (perfil, foto e exclusão de posts,
+    que muda a contagem exibida).
+    Retorna:
+        tuple[tuple, datetime | None]: Versão dos dados e a data da alteração
+            mais recente.
+    """
+    versao = db.session.execute(
+        select(
+            select(func.max(Post.id)).scalar_subquery(),
+            select(func.max(Post.data_edicao)).scalar_subquery(),
+            select(func.max(Usuario.atualizado_em)).scalar_subquery(),
+        )
+    ).one()
+    datas = [data for data in versao[1:] if data is not None]
+    return tuple(versao), max(datas) if datas else None
+
+
+def _cache_control(resposta, pode_guardar):
+    """
+    Define o Cache-Control: visitantes anônimos podem ter a página guardada
+    pelo navegador e pelo proxy por HTTP_CACHE_SEGUNDOS; usuários logados
+    sempre revalidam a página (privada) com o ETag.
+    Parâmetros:
+        resposta (Response): Resposta a ajustar.
+        pode_guardar (bool): Se a página pode ser guardada (sem mensagens flash).
+    """
+    if not pode_guardar:
+        resposta.cache_control.no_store = True  # Página com mensagem de uma vez só
+    elif current_user.is_authenticated:
+        resposta.cache_control.private = True
+        resposta.cache_control.no_cache = True  # Guarda, mas sempre revalida
+    else:
+        resposta.cache_control.public = True
+        resposta.cache_control.max_age = current_app.config["HTTP_CACHE_SEGUNDOS"]
+    resposta.vary.add("Cookie")  # A página muda conforme o login
+
+
+def _nao_modificado(etag, ultima_alteracao):
+    """
+    Verifica os cabeçalhos condicionais da requisição. O If-None-Match tem
+    prioridade; o If-Modified-Since só é usado quando ele não foi enviado.
+    Parâmetros:
+        etag (str): ETag da versão atual da página.
+        ultima_alteracao (datetime | None): Data da alteração mais recente.
+    Retorna:
+        bool: True se o cliente já tem a versão atual.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and ultima_alteracao:
+        return ultima_alteracao.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+class RespostaCondicional:
+    """
+    Resposta de um GET com ETag (e, se o conteúdo não depende do usuário,
+    Last-Modified) calculados a partir da versão dos dados. A rota cria o
+    objeto antes de consultar o banco e, se o cliente já tem a versão atual
+    (nao_modificado), responde 304 sem gerar a página.
+    O ETag inclui a rota e os parâmetros (do caminho e da query string) e, nas
+    páginas HTML, o usuário logado, pois a barra de navegação e alguns detalhes
+    mudam com o login. Essas páginas não enviam Last-Modified nem aceitam
+    If-Modified-Since, que só compara datas e devolveria 304 com a página de
+    outro usuário depois de um login ou logout. O ETag é sempre fraco (W/),
+    pois identifica o conteúdo e não os bytes, que mudam com a compressão.
+    Páginas com mensagens flash pendentes são sempre geradas e não são
+    guardadas.
+    """
+
+    def __init__(self, versao, ultima_alteracao=None, por_usuario=True):
+        if ultima_alteracao is not None and ultima_alteracao.tzinfo is None:
+            ultima_alteracao = ultima_alteracao.replace(
+                tzinfo=timezone.utc
+            )  # O banco guarda as datas sem fuso
+        if por_usuario:
+            ultima_alteracao = None  # Só o ETag distingue o usuário
+        self.ultima_alteracao = ultima_alteracao  # Data da alteração mais recente
+        self.etag = hashlib.sha1(
+            repr(
+                (
+                    request.endpoint,
+                    sorted((request.view_args or {}).items()),
+                    sorted(request.args.items(multi=True)),
+                    current_user.get_id() if por_usuario else None,
+                    versao,
+                )
+            ).encode()
+        ).hexdigest()[:20]  # Identifica esta versão da página
+        self.pode_guardar = "_flashes" not in session  # Mensagens são vistas uma vez
+        self.nao_modificado = self.pode_guardar and _nao_modificado(
+            self.etag, ultima_alteracao
+        )  # O cliente já tem a versão atual
+
+    def responder(self, corpo=""):
+        """
+        Monta a resposta com os cabeçalhos de cache.
+        Parâmetros:
+            corpo (str): Página gerada (ignorada quando nao_modificado).
+        Retorna:
+            Response: Página completa ou resposta 304.
+        """
+        if self.nao_modificado:
+            resposta = make_response("", 304)
+        else:
+            resposta = make_response(corpo)
+        resposta.set_etag(self.etag, weak=True)  # Mesmo ETag no 200 e no 304
+        if self.ultima_alteracao is not None:
+            resposta.last_modified = self.ultima_alteracao
+        _cache_control(resposta, self.pode_guardar)
+        return resposta
+
+
+def pagina_estatica(template):
+    """
+    Responde uma página sem dados do banco, renderizada uma única vez por
+    processo para visitantes anônimos e para logados (a barra de navegação
+    muda), com o hash do próprio conteúdo como versão.
+    Parâmetros:
+        template (str): Nome do template.
+    Retorna:
+        Response: Página completa ou resposta 304.
+    """
+    if "_flashes" in session:
+        return RespostaCondicional(()).responder(render_template(template))
+    paginas = current_app.extensions.setdefault("paginas_estaticas", {})
+    chave = (template, current_user.is_authenticated)
+    if chave not in paginas:
+        html = render_template(template)  # Renderiza só na primeira vez
+        paginas[chave] = (html, hashlib.sha1(html.encode()).hexdigest())
+    html, versao = paginas[chave]
+    return RespostaCondicional(versao).responder(html)
@@ -0,0 +1,191 @@
+import os  # Importa módulo para ler variáveis de ambiente e montar caminhos
+import re  # Importa expressões regulares para ajustar a URL do banco
+
+PASTA_APP = os.path.dirname(os.path.abspath(__file__))  # Pasta do pacote da aplicação
+
+
+def _env_int(nome, padrao):
+    """
+    Lê uma variável de ambiente inteira.
+    Parâmetros:
+        nome (str): Nome da variável.
+        padrao (int): Valor usado se a variável não estiver definida.
+    Retorna:
+        int: Valor da variável ou o padrão.
+    """
+    valor = os.environ.get(nome)
+    return int(valor) if valor not in (None, "") else padrao
+
+
+def _env_float(nome, padrao):
+    """
+    Lê uma variável de ambiente decimal.
+    Parâmetros:
+        nome (str): Nome da variável.
+        padrao (float): Valor usado se a variável não estiver definida.
+    Retorna:
+        float: Valor da variável ou o padrão.
+    """
+    valor = os.environ.get(nome)
+    return float(valor) if valor not in (None, "") else padrao
+
+
+def _env_bool(nome, padrao):
+    """
+    Lê uma variável de ambiente booleana ('1', 'true', 'sim' ou 'on' são verdadeiros).
+    Parâmetros:
+        nome (str): Nome da variável.
+        padrao (bool): Valor usado se a variável não estiver definida.
+    Retorna:
+        bool: Valor da variável ou o padrão.
+    """
+    valor = os.environ.get(nome)
+    if valor in (None, ""):
+        return padrao
+    return valor.strip().lower() in ("1", "true", "sim", "on")
+
+
+def _url_banco(variavel, padrao=""):
+    """
+    Lê a URL de um banco de uma variável de ambiente, trocando o prefixo
+    'postgres://' (usado pelo Heroku) pelo 'postgresql://' do SQLAlchemy.
+    Parâmetros:
+        variavel (str): Nome da variável.
+        padrao (str): URL usada se a variável não estiver definida.
+    Retorna:
+        str: URL do banco ou o padrão.
+    """
+    url = re.sub(r"^postgres://", "postgresql://", os.environ.get(variavel, ""))
+    return url or padrao
+
+
+def _opcoes_engine():
+    """
+    Monta as opções do engine do SQLAlchemy a partir das variáveis DB_POOL_*.
+    Só são incluídas as opções definidas, para que bancos em memória (que não
+    usam pool de conexões) continuem funcionando.
+    Retorna:
+        dict: Opções passadas ao create_engine.
+    """
+    opcoes = {"pool_pre_ping": _env_bool("DB_POOL_PRE_PING", False)}
+    for variavel, opcao in (
+        ("DB_POOL_SIZE", "pool_size"),
+        ("DB_POOL_MAX_OVERFLOW", "max_overflow"),
+        ("DB_POOL_TIMEOUT", "pool_timeout"),
+        ("DB_POOL_RECYCLE", "pool_recycle"),
+    ):
+        if os.environ.get(variavel):
+            opcoes[opcao] = _env_int(variavel, 0)
+    return opcoes
+
+
+class Config:
+    """
+    Configurações padrão da aplicação, lidas de variáveis de ambiente quando
+    definidas. Passe outra classe (ou um dicionário) para create_app para
+    sobrescrevê-las.
+    """
+
+    # Chave secreta para sessões e CSRF (a padrão é pública: defina SECRET_KEY em produção)
+    SECRET_KEY = os.environ.get("SECRET_KEY", "b85c99d270d663b913c678fd1565babf")
+    PROXY_SALTOS = _env_int(
+        "PROXY_SALTOS", 0
+    )  # Proxies confiáveis à frente da app (o IP do cliente vem do X-Forwarded-For)
+    SQLALCHEMY_DATABASE_URI = _url_banco(
+        "DATABASE_URL", "sqlite:///comunidade.db"
+    )  # Caminho do banco de dados principal
+    SQLALCHEMY_ENGINE_OPTIONS = _opcoes_engine()  # Pool de conexões do banco
+    SQLALCHEMY_BINDS = (
+        {"leitura": _url_banco("BANCO_LEITURA_URL")}
+        if os.environ.get("BANCO_LEITURA_URL")
+        else {}
+    )  # Banco de leitura (réplica) das rotas somente leitura, se definido
+    BANCO_LEITURA_CONSISTENCIA_SEGUNDOS = _env_int(
+        "BANCO_LEITURA_CONSISTENCIA_SEGUNDOS", 5
+    )  # Após uma escrita, o usuário lê do banco principal por esse tempo
+
+    BCRYPT_LOG_ROUNDS = _env_int("BCRYPT_LOG_ROUNDS", 12)  # Custo do hash das senhas
+    LOGIN_TENTATIVAS_POR_IP = _env_int("LOGIN_TENTATIVAS_POR_IP", 20)  # Por IP
+    LOGIN_TENTATIVAS_POR_CONTA = _env_int(
+        "LOGIN_TENTATIVAS_POR_CONTA", 5
+    )  # Logins errados por IP e conta
+    LOGIN_JANELA_SEGUNDOS = _env_int("LOGIN_JANELA_SEGUNDOS", 60)  # Janela dos limites
+
+    POSTS_POR_PAGINA = _env_int("POSTS_POR_PAGINA", 20)  # Posts por página do feed
+    USUARIOS_POR_PAGINA = _env_int("USUARIOS_POR_PAGINA", 20)  # Usuários por página
+    BUSCA_POR_PAGINA = _env_int("BUSCA_POR_PAGINA", 20)  # Resultados por página
+    LISTAGENS_STREAMING = _env_bool("LISTAGENS_STREAMING", False)  # Envia aos poucos
+    LISTAGENS_BLOCO = _env_int("LISTAGENS_BLOCO", 50)  # Cards lidos de cada vez
+    API_LIMITE_MAXIMO = _env_int("API_LIMITE_MAXIMO", 100)  # Itens por página da API
+    API_LOTE_MAXIMO = _env_int("API_LOTE_MAXIMO", 100)  # IDs por requisição de lote
+
+    IMAGENS_ASSINCRONAS = _env_bool("IMAGENS_ASSINCRONAS", True)  # Fotos em segundo plano
+    IMAGENS_TRABALHADORES = _env_int("IMAGENS_TRABALHADORES", 2)  # Threads do pool
+    IMAGENS_CARENCIA_SEGUNDOS = _env_int(
+        "IMAGENS_CARENCIA_SEGUNDOS", 600
+    )  # Idade mínima de uma imagem órfã para ser apagada
+    PASTA_IMAGENS = os.environ.get(
+        "PASTA_IMAGENS", os.path.join(PASTA_APP, "static", "imagens")
+    )  # Pasta onde as fotos de perfil são armazenadas
+    IMAGENS_CACHE_SEGUNDOS = _env_int(
+        "IMAGENS_CACHE_SEGUNDOS", 31536000
+    )  # Cache das fotos (nomes imutáveis)
+    if os.environ.get("ESTATICOS_PASTA"):
+        ESTATICOS_PASTA = os.environ["ESTATICOS_PASTA"]  # Estáticos versionados
+    ESTATICOS_CACHE_SEGUNDOS = _env_int(
+        "ESTATICOS_CACHE_SEGUNDOS", 31536000
+    )  # Cache dos estáticos versionados (nomes imutáveis)
+
+    CACHE_FRAGMENTOS_BACKEND = os.environ.get(
+        "CACHE_FRAGMENTOS_BACKEND", "memoria"
+    )  # 'memoria' ou 'sqlite'
+    CACHE_FRAGMENTOS_VERSOES = os.environ.get(
+        "CACHE_FRAGMENTOS_VERSOES", "sqlite"
+    )  # 'sqlite' (compartilhadas entre processos) ou 'memoria' (um só processo)
+    CACHE_FRAGMENTOS_LIMITE = _env_int("CACHE_FRAGMENTOS_LIMITE", 5000)  # Fragmentos
+    CACHE_FRAGMENTOS_ESPERA_SEGUNDOS = _env_int(
+        "CACHE_FRAGMENTOS_ESPERA_SEGUNDOS", 2
+    )  # Cards de objetos alterados há menos tempo não são gravados
+    if os.environ.get("CACHE_FRAGMENTOS_CAMINHO"):
+        CACHE_FRAGMENTOS_CAMINHO = os.environ["CACHE_FRAGMENTOS_CAMINHO"]  # Arquivo
+    USUARIOS_CACHE_LIMITE = _env_int("USUARIOS_CACHE_LIMITE", 1000)  # Usuários em cache
+    USUARIOS_CACHE_SEGUNDOS = _env_int("USUARIOS_CACHE_SEGUNDOS", 30)  # Validade
+
+    SQLITE_AJUSTES = _env_bool("SQLITE_AJUSTES", True)  # Aplica os PRAGMAs abaixo
+    SQLITE_WAL = _env_bool("SQLITE_WAL", True)  # Leitores não esperam escritores
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")  # fsync
+    SQLITE_CACHE_KB = _env_int("SQLITE_CACHE_KB", 65536)  # Cache de páginas (KiB)
+    SQLITE_MMAP_BYTES = _env_int("SQLITE_MMAP_BYTES", 268435456)  # Leitura mapeada
+    SQLITE_BUSY_TIMEOUT_MS = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)  # Espera a trava
+    ESCRITA_TENTATIVAS = _env_int("ESCRITA_TENTATIVAS", 5)  # Com o banco travado
+    ESCRITA_ESPERA_MS = _env_int("ESCRITA_ESPERA_MS", 50)  # Espera inicial
+
+    HTTP_CACHE_SEGUNDOS = _env_int("HTTP_CACHE_SEGUNDOS", 60)  # Páginas p/ anônimos
+    COMPRESSAO_ATIVA = _env_bool("COMPRESSAO_ATIVA", True)  # gzip/brotli nas respostas
+    COMPRESSAO_MINIMO_BYTES = _env_int("COMPRESSAO_MINIMO_BYTES", 500)  # Menor corpo
+    COMPRESSAO_NIVEL_GZIP = _env_int("COMPRESSAO_NIVEL_GZIP", 6)  # 1 (rápido) a 9
+    COMPRESSAO_NIVEL_BROTLI = _env_int("COMPRESSAO_NIVEL_BROTLI", 4)  # 0 (rápido) a 11
+    COMPRESSAO_CACHE_LIMITE = _env_int("COMPRESSAO_CACHE_LIMITE", 256)  # Corpos
+
+    METRICAS_ATIVAS = _env_bool("METRICAS_ATIVAS", False)  # Instrumentação e /metrics
+    METRICAS_CABECALHOS = _env_bool("METRICAS_CABECALHOS", True)  # Server-Timing
+    METRICAS_PERFIL_AMOSTRA = _env_float("METRICAS_PERFIL_AMOSTRA", 0.0)  # cProfile
+    METRICAS_PERFIL_LIMITE_MS = _env_int("METRICAS_PERFIL_LIMITE_MS", 500)  # Lentas
+    if os.environ.get("METRICAS_PERFIL_PASTA"):
+        METRICAS_PERFIL_PASTA = os.environ["METRICAS_PERFIL_PASTA"]  # Perfis gravados
+
+
+class ConfigTeste(Config):
+    """
+    Configurações para testes e benchmarks: banco em memória, sem CSRF, hash de
+    senha barato e fotos processadas na própria requisição.
+    """
+
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = "sqlite://"  # Banco em memória
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SQLALCHEMY_BINDS = {}  # Sem banco de leitura
+    CACHE_FRAGMENTOS_VERSOES = "memoria"  # Um só processo, sem arquivo
+    WTF_CSRF_ENABLED = False  # Formulários sem token CSRF
+    BCRYPT_LOG_ROUNDS = 4  # Custo mínimo do bcrypt
+    IMAGENS_ASSINCRONAS = False  # Processa as fotos na própria requisição
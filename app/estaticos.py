@@ -0,0 +1,190 @@
+import gzip  # Importa a compressão gzip das variantes pré-comprimidas
+import hashlib  # Importa funções de hash para versionar os arquivos pelo conteúdo
+import json  # Importa leitura e gravação do manifesto
+import mimetypes  # Importa o tipo de cada arquivo pela extensão original
+import os  # Importa módulo para manipulação de caminhos e diretórios
+import tempfile  # Importa criação de arquivos temporários para escrita atômica
+
+from flask import (  # Importa funções do Flask
+    current_app,
+    request,
+    send_from_directory,
+    url_for,
+)
+from werkzeug.utils import safe_join  # Importa junção de caminhos sem sair da pasta
+
+try:
+    import brotli  # Opcional: sem ele só são geradas as variantes gzip
+except ImportError:
+    brotli = None
+
+MANIFESTO = "manifesto.json"  # Nome original -> nome versionado
+COMPRIMIVEIS = {".css", ".js", ".svg", ".json", ".txt", ".html", ".map", ".ico"}
+CODIFICACOES = (("br", ".br"), ("gzip", ".gz"))  # Em ordem de preferência
+
+
+def _gravar(caminho, conteudo):
+    """
+    Grava um arquivo de forma atômica, se ele ainda não existir. Como o nome
+    depende do conteúdo, um arquivo existente já tem o conteúdo certo.
+    Parâmetros:
+        caminho (str): Caminho do arquivo.
+        conteudo (bytes): Conteúdo do arquivo.
+    """
+    if os.path.exists(caminho):
+        return
+    pasta = os.path.dirname(caminho)
+    os.makedirs(pasta, exist_ok=True)
+    descritor, caminho_temporario = tempfile.mkstemp(
+        suffix=".tmp", dir=pasta
+    )  # Arquivo temporário na mesma pasta, para o os.replace ser atômico
+    with os.fdopen(descritor, "wb") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(caminho_temporario, caminho)  # Publica o arquivo completo
+
+
+def _comprimir(conteudo):
+    """
+    Gera as variantes pré-comprimidas de um arquivo, no nível máximo (a
+    compressão é feita uma vez, no build). A variante brotli só é gerada se o
+    pacote 'brotli' estiver instalado.
+    Parâmetros:
+        conteudo (bytes): Conteúdo original.
+    Retorna:
+        dict[str, bytes]: Sufixo ('.br' ou '.gz') -> conteúdo comprimido, só
+            das variantes menores que o original.
+    """
+    variantes = {".gz": gzip.compress(conteudo, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variantes[".br"] = brotli.compress(conteudo, quality=11)
+    return {
+        sufixo: comprimido
+        for sufixo, comprimido in variantes.items()
+        if len(comprimido) < len(conteudo)
+    }
+
+
+class Estaticos:
+    """
+    Arquivos estáticos versionados pelo conteúdo e pré-comprimidos. O build
+    (comando 'flask gerar-estaticos') copia cada arquivo da pasta static para
+    ESTATICOS_PASTA com o hash do conteúdo no nome, grava ao lado as variantes
+    .gz e .br dos arquivos de texto e registra os nomes em um manifesto. Em
+    execução, url() aponta para o nome versionado e servir() envia a menor
+    variante aceita pelo navegador (Accept-Encoding), com cache imutável:
+    quem volta ao site não baixa de novo nenhum arquivo que não mudou. Sem o
+    manifesto (build não executado), url() cai no url_for('static') padrão.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configura a pasta dos arquivos gerados e carrega o manifesto, se existir.
+        Parâmetros:
+            app (Flask): Instância da aplicação.
+        """
+        app.config.setdefault(
+            "ESTATICOS_PASTA", os.path.join(app.static_folder, "dist")
+        )
+        app.config.setdefault("ESTATICOS_CACHE_SEGUNDOS", 31536000)
+        caminho = os.path.join(app.config["ESTATICOS_PASTA"], MANIFESTO)
+        manifesto = {}
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as arquivo:
+                manifesto = json.load(arquivo)  # Lido uma vez por processo
+        app.extensions["estaticos"] = manifesto
+
+    def gerar(self):
+        """
+        Gera as cópias versionadas e pré-comprimidas de todos os arquivos da
+        pasta static e grava o manifesto. As fotos enviadas pelos usuários, que
+        já têm nome pelo conteúdo e são servidas pela rota /imagens, ficam de
+        fora; a foto padrão entra. Versões antigas não são apagadas, para que
+        páginas já em cache continuem encontrando os seus arquivos.
+        Retorna:
+            dict[str, str]: Manifesto gerado.
+        """
+        from app.imagens import FOTO_PADRAO  # Importa aqui para evitar ciclo
+
+        origem = os.path.abspath(current_app.static_folder)
+        destino = os.path.abspath(current_app.config["ESTATICOS_PASTA"])
+        imagens = os.path.abspath(current_app.config["PASTA_IMAGENS"])
+        manifesto = {}
+        for raiz, pastas, arquivos in os.walk(origem):
+            pastas[:] = sorted(
+                pasta for pasta in pastas if os.path.join(raiz, pasta) != destino
+            )  # Não reprocessa os arquivos gerados
+            for nome_arquivo in sorted(arquivos):
+                if raiz == imagens and nome_arquivo != FOTO_PADRAO:
+                    continue  # Foto enviada por usuário
+                caminho = os.path.join(raiz, nome_arquivo)
+                relativo = os.path.relpath(caminho, origem).replace(os.sep, "/")
+                with open(caminho, "rb") as arquivo:
+                    conteudo = arquivo.read()
+                base, extensao = os.path.splitext(relativo)
+                versionado = (
+                    f"{base}.{hashlib.sha256(conteudo).hexdigest()[:12]}{extensao}"
+                )  # O nome muda sempre que o conteúdo muda
+                caminho_versionado = os.path.join(destino, versionado)
+                _gravar(caminho_versionado, conteudo)
+                if extensao.lower() in COMPRIMIVEIS:
+                    for sufixo, comprimido in _comprimir(conteudo).items():
+                        _gravar(caminho_versionado + sufixo, comprimido)
+                manifesto[relativo] = versionado
+        os.makedirs(destino, exist_ok=True)
+        descritor, caminho_temporario = tempfile.mkstemp(suffix=".tmp", dir=destino)
+        with os.fdopen(descritor, "w", encoding="utf-8") as arquivo:
+            json.dump(manifesto, arquivo, indent=2, sort_keys=True)
+        os.replace(caminho_temporario, os.path.join(destino, MANIFESTO))
+        current_app.extensions["estaticos"] = manifesto  # Vale já neste processo
+        return manifesto
+
+    def url(self, nome):
+        """
+        Monta a URL de um arquivo estático, usando o nome versionado quando o
+        build já foi executado.
+        Parâmetros:
+            nome (str): Caminho do arquivo dentro da pasta static.
+        Retorna:
+            str: URL do arquivo.
+        """
+        versionado = current_app.extensions["estaticos"].get(nome)
+        if versionado is None:
+            return url_for("static", filename=nome)  # Arquivo original, sem build
+        return url_for("principal.estatico", nome_arquivo=versionado)
+
+    def servir(self, nome_arquivo):
+        """
+        Envia um arquivo versionado, escolhendo a variante pré-comprimida de
+        acordo com o Accept-Encoding da requisição.
+        Parâmetros:
+            nome_arquivo (str): Nome versionado do arquivo.
+        Retorna:
+            Response: Arquivo com cabeçalhos de cache imutável.
+        """
+        pasta = current_app.config["ESTATICOS_PASTA"]
+        codificacao, sufixo = None, ""
+        for candidata, extensao in CODIFICACOES:
+            if not request.accept_encodings[candidata]:
+                continue  # Codificação não aceita pelo navegador
+            caminho = safe_join(pasta, nome_arquivo + extensao)
+            if caminho and os.path.isfile(caminho):
+                codificacao, sufixo = candidata, extensao  # Menor variante aceita
+                break
+        resposta = send_from_directory(
+            pasta,
+            nome_arquivo + sufixo,
+            mimetype=mimetypes.guess_type(nome_arquivo)[0],  # Tipo do original
+            max_age=current_app.config["ESTATICOS_CACHE_SEGUNDOS"],
+            etag=nome_arquivo + sufixo,
+        )  # Envia o arquivo respondendo 304 quando o ETag coincide
+        if codificacao is not None:
+            resposta.content_encoding = codificacao
+        if os.path.splitext(nome_arquivo)[1].lower() in COMPRIMIVEIS:
+            resposta.vary.add("Accept-Encoding")  # A resposta muda com o cabeçalho
+        resposta.cache_control.public = True
+        resposta.cache_control.immutable = True  # O conteúdo de um nome nunca muda
+        return resposta
@@ -0,0 +1,266 @@
+import hashlib  # Importa funções de hash para nomear as imagens pelo conteúdo
+import io  # Importa módulo para tratar bytes como arquivo
+import os  # Importa módulo para manipulação de caminhos e diretórios
+import tempfile  # Importa criação de arquivos temporários para escrita atômica
+import threading  # Importa módulo para sincronizar a criação do pool
+import time  # Importa o relógio da carência antes de apagar imagens
+from concurrent.futures import ThreadPoolExecutor  # Importa o pool de threads
+
+from flask import current_app, url_for  # Importa funções do Flask
+from PIL import Image  # Importa biblioteca para manipulação de imagens
+
+from app import (  # Importa instâncias do banco de dados, caches e estáticos
+    cache_fragmentos,
+    cache_usuarios,
+    db,
+    estaticos,
+)
+from app.banco import escrever  # Importa as escritas com nova tentativa
+from app.models import Usuario  # Importa o modelo de usuário
+
+TAMANHOS_IMAGEM = (400, 200, 64)  # Larguras máximas geradas, da maior para a menor
+FOTO_PADRAO = "default.jpg"  # Foto usada por quem ainda não enviou uma
+_executor = None  # Pool de threads criado sob demanda
+_trava_executor = threading.Lock()  # Evita criar dois pools em paralelo
+
+
+def _obter_executor():
+    """
+    Retorna o pool de threads que processa as imagens, criando-o na primeira vez.
+    O pool é criado sob demanda para que cada processo do gunicorn tenha o seu.
+    Retorna:
+        ThreadPoolExecutor: Pool usado para processar as imagens.
+    """
+    global _executor
+    with _trava_executor:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config["IMAGENS_TRABALHADORES"],
+                thread_name_prefix="imagens",
+            )  # Cria o pool com a quantidade configurada de threads
+    return _executor
+
+
+def pasta_imagens():
+    """
+    Retorna a pasta onde as fotos de perfil são armazenadas.
+    Retorna:
+        str: Caminho da pasta configurada em PASTA_IMAGENS.
+    """
+    return current_app.config["PASTA_IMAGENS"]
+
+
+def processar_imagem(conteudo):
+    """
+    Gera as variantes em WebP de uma imagem, uma para cada tamanho de TAMANHOS_IMAGEM.
+    Imagens JPEG são decodificadas em modo 'draft', já reduzidas pelo próprio
+    decodificador, e cada variante é gerada a partir da anterior.
+    Parâmetros:
+        conteudo (bytes): Conteúdo do arquivo enviado.
+    Retorna:
+        dict[int, bytes]: Bytes de cada variante, indexados pelo tamanho.
+    """
+    imagem = Image.open(io.BytesIO(conteudo))  # Abre a imagem a partir dos bytes
+    maior = TAMANHOS_IMAGEM[0]
+    imagem.draft("RGB", (maior, maior))  # Reduz já na decodificação (só JPEG)
+    if imagem.mode not in ("RGB", "RGBA"):
+        imagem = imagem.convert(
+            "RGBA" if "transparency" in imagem.info or "A" in imagem.mode else "RGB"
+        )  # Converte para um modo suportado pelo WebP
+    variantes = {}
+    for tamanho in TAMANHOS_IMAGEM:
+        imagem.thumbnail((tamanho, tamanho))  # Reduz a partir da variante anterior
+        saida = io.BytesIO()
+        imagem.save(saida, "WEBP", quality=80)  # Codifica a variante em memória
+        variantes[tamanho] = saida.getvalue()
+    return variantes
+
+
+def nome_por_conteudo(variantes):
+    """
+    Calcula o nome de uma imagem a partir do hash das suas variantes processadas,
+    de modo que imagens idênticas compartilham os mesmos arquivos.
+    Parâmetros:
+        variantes (dict[int, bytes]): Bytes de cada variante.
+    Retorna:
+        str: Nome base da imagem.
+    """
+    hash_conteudo = hashlib.sha256()
+    for tamanho in TAMANHOS_IMAGEM:
+        hash_conteudo.update(variantes[tamanho])
+    return hash_conteudo.hexdigest()[:32]
+
+
+def arquivos_imagem(nome):
+    """
+    Lista os nomes de arquivo das variantes de uma imagem.
+    Parâmetros:
+        nome (str): Nome base da imagem (valor de Usuario.foto_perfil).
+    Retorna:
+        list[str]: Nomes dos arquivos (um só para fotos no formato antigo).
+    """
+    if "." in nome:
+        return [nome]  # Foto no formato antigo, com extensão no nome
+    return [f"{nome}-{tamanho}.webp" for tamanho in TAMANHOS_IMAGEM]
+
+
+def salvar_variantes(variantes, caminho_pasta):
+    """
+    Salva as variantes de uma imagem com o nome derivado do seu conteúdo.
+    Arquivos que já existem não são reescritos (deduplicação), só têm a data de
+    modificação renovada, para que a limpeza das imagens órfãs não os apague
+    durante a carência; os novos são gravados em um arquivo temporário e
+    renomeados, para nunca serem servidos pela metade.
+    Parâmetros:
+        variantes (dict[int, bytes]): Bytes de cada variante.
+        caminho_pasta (str): Pasta onde as variantes serão salvas.
+    Retorna:
+        str: Nome base da imagem.
+    """
+    nome = nome_por_conteudo(variantes)
+    os.makedirs(caminho_pasta, exist_ok=True)  # Garante que a pasta existe
+    for tamanho, nome_arquivo in zip(TAMANHOS_IMAGEM, arquivos_imagem(nome)):
+        caminho_arquivo = os.path.join(caminho_pasta, nome_arquivo)
+        try:
+            os.utime(caminho_arquivo)  # Conteúdo idêntico já armazenado
+            continue
+        except FileNotFoundError:
+            pass  # Ainda não existe (ou acabou de ser apagado): grava
+        descritor, caminho_temporario = tempfile.mkstemp(
+            suffix=".tmp", dir=caminho_pasta
+        )  # Arquivo temporário na mesma pasta, para o os.replace ser atômico
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(variantes[tamanho])
+        os.replace(caminho_temporario, caminho_arquivo)  # Publica o arquivo completo
+    return nome
+
+
+def recente(caminho_arquivo):
+    """
+    Verifica se um arquivo de imagem foi gravado ou reaproveitado há menos de
+    IMAGENS_CARENCIA_SEGUNDOS. Um envio em andamento da mesma imagem pode estar
+    prestes a referenciá-lo, então ele não deve ser apagado ainda.
+    Parâmetros:
+        caminho_arquivo (str): Caminho do arquivo.
+    Retorna:
+        bool: True se o arquivo é recente.
+    """
+    try:
+        idade = time.time() - os.path.getmtime(caminho_arquivo)
+    except FileNotFoundError:
+        return False
+    return idade < current_app.config["IMAGENS_CARENCIA_SEGUNDOS"]
+
+
+def remover_se_orfa(nome, caminho_pasta):
+    """
+    Apaga os arquivos de uma imagem se nenhum usuário fizer mais referência a ela
+    e nenhum deles for recente (veja 'recente').
+    Parâmetros:
+        nome (str): Nome base da imagem.
+        caminho_pasta (str): Pasta onde as imagens estão armazenadas.
+    Retorna:
+        bool: True se os arquivos foram apagados.
+    """
+    if not nome or nome == FOTO_PADRAO:
+        return False
+    if db.session.query(Usuario.query.filter_by(foto_perfil=nome).exists()).scalar():
+        return False  # Ainda existem usuários usando a imagem (índice de foto_perfil)
+    caminhos = [
+        os.path.join(caminho_pasta, arquivo) for arquivo in arquivos_imagem(nome)
+    ]
+    if any(recente(caminho) for caminho in caminhos):
+        return False  # Pode estar sendo enviada de novo; fica para o limpar-imagens
+    for caminho_arquivo in caminhos:
+        if os.path.exists(caminho_arquivo):
+            os.remove(caminho_arquivo)
+    return True
+
+
+def _processar_foto_perfil(aplicacao, usuario_id, conteudo):
+    """
+    Processa a foto de perfil fora da requisição e atualiza o usuário ao final,
+    de modo que a foto antiga continua sendo exibida até as variantes existirem.
+    A foto antiga é apagada se mais ninguém a utilizar. Depois de salvar, as
+    variantes são conferidas e regravadas se uma limpeza concorrente as apagou
+    entre a deduplicação e a gravação no banco.
+    Parâmetros:
+        aplicacao (Flask): Instância da aplicação.
+        usuario_id (int): ID do usuário dono da foto.
+        conteudo (bytes): Conteúdo do arquivo enviado.
+    """
+    with aplicacao.app_context():
+        try:
+            caminho_pasta = pasta_imagens()  # Caminho da pasta de imagens
+            variantes = processar_imagem(conteudo)
+            nome = salvar_variantes(variantes, caminho_pasta)
+
+            def salvar_foto():
+                usuario = db.session.get(Usuario, usuario_id)  # Recarrega o usuário
+                antiga = usuario.foto_perfil  # Foto que será substituída
+                usuario.foto_perfil = nome  # Aponta para as novas variantes
+                return antiga
+
+            antiga = escrever(salvar_foto)  # Salva no banco
+            salvar_variantes(variantes, caminho_pasta)  # Regrava as que faltarem
+            cache_fragmentos.invalidar("usuario", usuario_id)  # Cards com a foto
+            cache_usuarios.invalidar(usuario_id)  # Dados do usuário em cache
+            if antiga != nome:
+                remover_se_orfa(antiga, caminho_pasta)  # Libera a foto antiga
+        except Exception:
+            db.session.rollback()
+            aplicacao.logger.exception(
+                "Falha ao processar a foto de perfil do usuário %s", usuario_id
+            )
+
+
+def agendar_foto_perfil(usuario_id, imagem):
+    """
+    Lê o arquivo enviado e agenda o processamento da foto de perfil no pool de
+    threads, liberando a requisição sem esperar pelo Pillow. Com a configuração
+    IMAGENS_ASSINCRONAS desligada o processamento é feito na própria requisição.
+    Parâmetros:
+        usuario_id (int): ID do usuário dono da foto.
+        imagem (FileStorage): Arquivo de imagem enviado pelo usuário.
+    """
+    conteudo = imagem.read()  # Lê os bytes enquanto a requisição está aberta
+    aplicacao = current_app._get_current_object()
+    if current_app.config["IMAGENS_ASSINCRONAS"]:
+        _obter_executor().submit(
+            _processar_foto_perfil, aplicacao, usuario_id, conteudo
+        )  # Processa em segundo plano
+    else:
+        _processar_foto_perfil(aplicacao, usuario_id, conteudo)
+
+
+def url_foto(nome, tamanho=200):
+    """
+    Monta a URL da variante de uma foto de perfil com o tamanho pedido.
+    Fotos antigas (com extensão no nome, como 'default.jpg') têm um único arquivo.
+    Parâmetros:
+        nome (str): Valor de Usuario.foto_perfil.
+        tamanho (int): Largura desejada, um dos valores de TAMANHOS_IMAGEM.
+    Retorna:
+        str: URL da imagem.
+    """
+    if "." in nome:
+        return estaticos.url(f"imagens/{nome}")  # Foto no formato antigo
+    return url_for(
+        "principal.imagem", nome_arquivo=f"{nome}-{tamanho}.webp"
+    )  # Variante com nome pelo conteúdo, servida com cache imutável
+
+
+def srcset_foto(nome):
+    """
+    Monta o atributo 'srcset' com todas as variantes de uma foto de perfil, para
+    que o navegador escolha a menor que atenda ao tamanho exibido.
+    Parâmetros:
+        nome (str): Valor de Usuario.foto_perfil.
+    Retorna:
+        str: Valor do atributo 'srcset' (vazio para fotos no formato antigo).
+    """
+    if "." in nome:
+        return ""
+    return ", ".join(
+        f"{url_foto(nome, tamanho)} {tamanho}w" for tamanho in TAMANHOS_IMAGEM
+    )
@@ -0,0 +1,322 @@
+import csv  # Importa leitura de arquivos CSV
+import itertools  # Importa a divisão dos registros em lotes
+import json  # Importa leitura de arquivos JSONL
+import os  # Importa módulo para manipulação de caminhos
+from datetime import datetime, timezone  # Importa a conversão das datas
+
+from sqlalchemy import insert, select, update  # Importa instruções em lote
+
+from app import bcrypt, cache_fragmentos, db  # Importa o bcrypt, o cache e o banco
+from app.banco import escrever  # Importa a escrita com novas tentativas
+from app.busca import indexar_posts  # Importa a indexação em lote para a busca
+from app.models import (  # Importa os modelos
+    Curso,
+    Post,
+    Usuario,
+    agora_utc,
+    usuario_curso,
+)
+
+FORMATOS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}  # Pela extensão
+PREFIXOS_BCRYPT = ("$2a$", "$2b$", "$2y$")  # Senhas que já chegam como hash
+
+
+class ErroImportacao(ValueError):
+    """
+    Registro inválido no arquivo importado. A mensagem traz o número da linha.
+    """
+
+
+def ler_registros(caminho, formato=None):
+    """
+    Lê um arquivo JSONL (um objeto por linha) ou CSV (com cabeçalho) aos
+    poucos, sem carregá-lo inteiro na memória.
+    Parâmetros:
+        caminho (str): Caminho do arquivo.
+        formato (str | None): 'jsonl' ou 'csv' (None: pela extensão).
+    Retorna:
+        Iterator[tuple[int, dict]]: Número da linha e campos de cada registro.
+    """
+    formato = formato or FORMATOS.get(os.path.splitext(caminho)[1].lower())
+    if formato is None:
+        raise ErroImportacao(f"Formato desconhecido: {caminho} (use .jsonl ou .csv)")
+    with open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+        if formato == "csv":
+            leitor = csv.DictReader(arquivo)
+            for registro in leitor:
+                yield leitor.line_num, registro
+            return
+        for numero, linha in enumerate(arquivo, 1):
+            if not linha.strip():
+                continue  # Linha em branco
+            try:
+                registro = json.loads(linha)
+            except ValueError as erro:
+                raise ErroImportacao(f"Linha {numero}: JSON inválido ({erro})")
+            if not isinstance(registro, dict):
+                raise ErroImportacao(f"Linha {numero}: esperado um objeto JSON")
+            yield numero, registro
+
+
+def _valor(registro, campo):
+    """
+    Lê um campo de um registro; textos vazios (comuns no CSV) contam como ausentes.
+    Parâmetros:
+        registro (dict): Campos do registro.
+        campo (str): Nome do campo.
+    Retorna:
+        Any: Valor do campo ou None.
+    """
+    valor = registro.get(campo)
+    if isinstance(valor, str):
+        valor = valor.strip()
+    return None if valor in (None, "") else valor
+
+
+def _obrigatorio(numero, registro, campo):
+    valor = _valor(registro, campo)
+    if valor is None:
+        raise ErroImportacao(f"Linha {numero}: campo '{campo}' obrigatório")
+    return valor
+
+
+def _inteiro(numero, registro, campo):
+    valor = _valor(registro, campo)
+    try:
+        return None if valor is None else int(valor)
+    except (TypeError, ValueError):
+        raise ErroImportacao(f"Linha {numero}: '{campo}' deve ser um número inteiro")
+
+
+def _data(numero, registro, campo):
+    """
+    Converte um campo de data ISO 8601 para UTC (datas sem fuso já são UTC).
+    Parâmetros:
+        numero (int): Linha do registro, para a mensagem de erro.
+        registro (dict): Campos do registro.
+        campo (str): Nome do campo.
+    Retorna:
+        datetime | None: Data em UTC ou None se o campo estiver ausente.
+    """
+    valor = _valor(registro, campo)
+    if valor is None:
+        return None
+    try:
+        data = datetime.fromisoformat(valor)
+    except (TypeError, ValueError):
+        raise ErroImportacao(f"Linha {numero}: '{campo}' deve ser uma data ISO 8601")
+    if data.tzinfo is None:
+        return data.replace(tzinfo=timezone.utc)
+    return data.astimezone(timezone.utc)
+
+
+def _lotes(registros, tamanho):
+    registros = iter(registros)
+    while lote := list(itertools.islice(registros, tamanho)):
+        yield lote
+
+
+def _inserir(tabela, linhas, *colunas):
+    """
+    Insere linhas com executemany e devolve as colunas pedidas de cada linha
+    inserida. As linhas são agrupadas pelos campos presentes (por exemplo, com
+    e sem 'id'), pois cada instrução em lote exige os mesmos campos em todas as
+    linhas. O RETURNING não garante a ordem das linhas (exigir a ordem faria o
+    SQLite inserir uma linha por vez), então as colunas devolvidas devem
+    identificar cada linha.
+    Parâmetros:
+        tabela (Table): Tabela do modelo.
+        linhas (list[dict]): Colunas de cada linha.
+        *colunas (Column): Colunas devolvidas.
+    Retorna:
+        list[Row]: Colunas pedidas das linhas inseridas, em qualquer ordem.
+    """
+    grupos = {}
+    for linha in linhas:
+        grupos.setdefault(frozenset(linha), []).append(linha)
+    inseridas = []
+    for grupo in grupos.values():
+        inseridas += db.session.execute(
+            insert(tabela).returning(*colunas), grupo
+        ).all()  # Várias linhas por instrução (insertmanyvalues)
+    return inseridas
+
+
+def inserir_usuarios(registros, lote=5000, custo_senha=None, progresso=None):
+    """
+    Importa usuários em lotes, um lote por transação. Campos: 'username',
+    'email' e 'senha' (obrigatórios), 'id', 'foto_perfil' e 'cursos' (lista ou
+    nomes separados por ponto e vírgula). Senhas que já são hashes bcrypt são
+    mantidas; as demais recebem um hash com 'custo_senha', refeito com o custo
+    configurado no primeiro login. E-mails já cadastrados são ignorados, então
+    uma importação interrompida pode ser repetida com o mesmo arquivo.
+    Parâmetros:
+        registros (Iterable[tuple[int, dict]]): Registros de ler_registros.
+        lote (int): Registros por transação.
+        custo_senha (int | None): Custo do bcrypt das senhas em texto (None:
+            BCRYPT_LOG_ROUNDS).
+        progresso (Callable | None): Chamada após cada lote com os totais de
+            importados e ignorados.
+    Retorna:
+        tuple[int, int]: Usuários importados e ignorados.
+    """
+    importados = ignorados = 0
+    for registros_lote in _lotes(registros, lote):
+        novos = {}
+        for numero, registro in registros_lote:
+            email = _obrigatorio(numero, registro, "email")
+            senha = _obrigatorio(numero, registro, "senha")
+            cursos = _valor(registro, "cursos") or []
+            if isinstance(cursos, str):
+                cursos = [nome.strip() for nome in cursos.split(";") if nome.strip()]
+            linha = {
+                "username": _obrigatorio(numero, registro, "username"),
+                "email": email,
+                "senha": senha,
+                "foto_perfil": _valor(registro, "foto_perfil") or "default.jpg",
+            }
+            usuario_id = _inteiro(numero, registro, "id")
+            if usuario_id is not None:
+                linha["id"] = usuario_id
+            novos.setdefault(email, (linha, cursos))  # Repetido no arquivo: o 1º
+        existentes = set(
+            db.session.scalars(
+                select(Usuario.email).where(Usuario.email.in_(list(novos)))
+            )
+        )  # Já cadastrados (importação repetida ou conta criada pelo site)
+        novos = [novo for email, novo in novos.items() if email not in existentes]
+        for linha, _ in novos:
+            if not linha["senha"].startswith(PREFIXOS_BCRYPT):
+                linha["senha"] = bcrypt.generate_password_hash(
+                    linha["senha"], custo_senha
+                ).decode("utf-8")  # Fora da transação: o bcrypt é lento
+
+        def salvar_lote():
+            nomes = sorted({nome for _, cursos in novos for nome in cursos})
+            cursos_por_nome = {
+                curso.nome: curso for curso in Curso.obter_ou_criar(nomes)
+            }  # Cria os cursos que ainda não existem
+            db.session.flush()  # Gera os IDs dos cursos novos
+            tabela = Usuario.__table__
+            linhas = [linha for linha, _ in novos]
+            ids = dict(
+                _inserir(tabela, linhas, tabela.c.email, tabela.c.id)
+            )  # E-mail -> ID gerado
+            inscricoes = [
+                {
+                    "usuario_id": ids[linha["email"]],
+                    "curso_id": cursos_por_nome[nome].id,
+                }
+                for linha, cursos in novos
+                for nome in dict.fromkeys(cursos)
+            ]
+            if inscricoes:
+                db.session.execute(insert(usuario_curso), inscricoes)
+
+        if novos:
+            escrever(salvar_lote)  # Um lote inteiro por transação
+        importados += len(novos)
+        ignorados += len(registros_lote) - len(novos)
+        if progresso:
+            progresso(importados, ignorados)
+    return importados, ignorados
+
+
+def inserir_posts(registros, lote=5000, progresso=None):
+    """
+    Importa posts em lotes, um lote por transação, já indexados para a busca.
+    Campos: 'titulo', 'conteudo' e o autor, por 'usuario_id' ou 'email_autor'
+    (obrigatórios), 'id', 'data_postagem' e 'data_edicao' (ISO 8601). Posts
+    com um 'id' já existente são ignorados, então uma importação interrompida
+    pode ser repetida com o mesmo arquivo se os registros tiverem ID.
+    Parâmetros:
+        registros (Iterable[tuple[int, dict]]): Registros de ler_registros.
+        lote (int): Registros por transação.
+        progresso (Callable | None): Chamada após cada lote com os totais de
+            importados e ignorados.
+    Retorna:
+        tuple[int, int]: Posts importados e ignorados.
+    """
+    importados = ignorados = 0
+    for registros_lote in _lotes(registros, lote):
+        campos = [
+            (
+                numero,
+                _inteiro(numero, registro, "id"),
+                _inteiro(numero, registro, "usuario_id"),
+                _valor(registro, "email_autor"),
+                registro,
+            )
+            for numero, registro in registros_lote
+        ]
+        emails = {email for _, _, _, email, _ in campos if email}
+        autores = dict(
+            db.session.execute(
+                select(Usuario.email, Usuario.id).where(Usuario.email.in_(emails))
+            ).all()
+        )  # E-mail -> ID dos autores informados pelo e-mail
+        ids_autores = {autor for _, _, autor, _, _ in campos if autor is not None}
+        validos = set(
+            db.session.scalars(select(Usuario.id).where(Usuario.id.in_(ids_autores)))
+        )  # Autores informados pelo ID que existem
+        ids_posts = {post_id for _, post_id, _, _, _ in campos if post_id is not None}
+        existentes = set(
+            db.session.scalars(select(Post.id).where(Post.id.in_(ids_posts)))
+        )  # Posts já importados
+        novos = []
+        for numero, post_id, autor, email, registro in campos:
+            if post_id in existentes:
+                continue
+            if autor is None and email is None:
+                raise ErroImportacao(
+                    f"Linha {numero}: informe 'usuario_id' ou 'email_autor'"
+                )
+            if autor is None:
+                autor = autores.get(email)  # Autor informado pelo e-mail
+            elif autor not in validos:
+                autor = None
+            if autor is None:
+                raise ErroImportacao(f"Linha {numero}: autor não encontrado")
+            linha = {
+                "titulo": _obrigatorio(numero, registro, "titulo"),
+                "conteudo": _obrigatorio(numero, registro, "conteudo"),
+                "usuario_id": autor,
+                "data_postagem": _data(numero, registro, "data_postagem")
+                or agora_utc(),
+            }
+            data_edicao = _data(numero, registro, "data_edicao")
+            if data_edicao is not None:
+                linha["data_edicao"] = data_edicao
+            if post_id is not None:
+                linha["id"] = post_id
+                existentes.add(post_id)  # Repetido no arquivo: só o primeiro
+            novos.append(linha)
+        autores_lote = {linha["usuario_id"] for linha in novos}
+
+        def salvar_lote():
+            tabela = Post.__table__
+            indexar_posts(
+                [
+                    linha._asdict()
+                    for linha in _inserir(
+                        tabela, novos, tabela.c.id, tabela.c.titulo, tabela.c.conteudo
+                    )
+                ]
+            )  # Na mesma transação dos posts
+            db.session.execute(
+                update(Usuario)
+                .where(Usuario.id.in_(autores_lote))
+                .values(atualizado_em=agora_utc())
+                .execution_options(synchronize_session=False)
+            )  # A contagem de posts dos autores mudou
+
+        if novos:
+            escrever(salvar_lote)  # Um lote inteiro por transação
+            for autor in autores_lote:
+                # Pelas versões compartilhadas, vale também para os workers no ar
+                cache_fragmentos.invalidar("usuario", autor)  # Cards dos autores
+        importados += len(novos)
+        ignorados += len(registros_lote) - len(novos)
+        if progresso:
+            progresso(importados, ignorados)
+    return importados, ignorados
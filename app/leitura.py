@@ -0,0 +1,83 @@
+import functools  # Importa wraps para preservar os dados das rotas decoradas
+import time  # Importa o relógio do prazo de leitura no banco principal
+
+from flask import (  # Importa funções do Flask
+    current_app,
+    g,
+    has_app_context,
+    has_request_context,
+    request,
+    session,
+)
+from flask_sqlalchemy.session import Session  # Importa a sessão do Flask-SQLAlchemy
+
+BIND_LEITURA = "leitura"  # Chave de SQLALCHEMY_BINDS do banco de leitura
+CHAVE_PRIMARIO = "_ler_primario_ate"  # Na sessão do navegador: prazo do primário
+
+
+class SessaoRoteada(Session):
+    """
+    Sessão do banco que envia as consultas das rotas marcadas com
+    somente_leitura para o banco de leitura (bind 'leitura', uma réplica ou
+    outro pool de conexões), quando ele está configurado. Escritas (flush) e
+    qualquer consulta fora dessas rotas continuam no banco principal.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and usando_banco_leitura():
+            return self._db.engines[BIND_LEITURA]  # Escritas (flush) nunca vêm aqui
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def usando_banco_leitura():
+    """
+    Verifica se as consultas do contexto atual vão ao banco de leitura.
+    Retorna:
+        bool: True dentro de uma rota somente_leitura que usa o banco de leitura.
+    """
+    return has_app_context() and g.get("banco_leitura", False)
+
+
+def banco_leitura_configurado():
+    """
+    Verifica se a aplicação atual tem um banco de leitura.
+    Retorna:
+        bool: True se SQLALCHEMY_BINDS tem a chave 'leitura'.
+    """
+    return BIND_LEITURA in (current_app.config.get("SQLALCHEMY_BINDS") or {})
+
+
+def somente_leitura(rota):
+    """
+    Decorador das rotas que só consultam o banco: os GETs são atendidos pelo
+    banco de leitura, exceto para quem escreveu algo há menos de
+    BANCO_LEITURA_CONSISTENCIA_SEGUNDOS, que lê do banco principal e vê a
+    própria alteração mesmo com a réplica atrasada.
+    Parâmetros:
+        rota (Callable): Função da rota.
+    Retorna:
+        Callable: Rota decorada.
+    """
+
+    @functools.wraps(rota)
+    def decorada(*args, **kwargs):
+        if request.method in ("GET", "HEAD") and banco_leitura_configurado():
+            prazo = session.get(CHAVE_PRIMARIO)  # Prazo da última escrita
+            if prazo is None or prazo < time.time():
+                g.banco_leitura = True  # Lido por SessaoRoteada
+        return rota(*args, **kwargs)
+
+    return decorada
+
+
+def marcar_escrita():
+    """
+    Registra na sessão do navegador que houve uma escrita nesta requisição:
+    as próximas leituras deste usuário vão ao banco principal por
+    BANCO_LEITURA_CONSISTENCIA_SEGUNDOS (0 desliga).
+    """
+    if not has_request_context() or not banco_leitura_configurado():
+        return  # Comandos e tarefas em segundo plano, ou sem banco de leitura
+    segundos = current_app.config["BANCO_LEITURA_CONSISTENCIA_SEGUNDOS"]
+    if segundos > 0:
+        session[CHAVE_PRIMARIO] = time.time() + segundos
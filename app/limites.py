@@ -0,0 +1,142 @@
+import threading  # Importa primitivas de sincronização entre threads
+import time  # Importa funções de tempo usadas para reabastecer os limites
+from collections import Counter, OrderedDict  # Importa contadores e dicionário LRU
+
+from flask import current_app  # Importa a aplicação da requisição atual
+
+
+class BackendLimiteMemoria:
+    """
+    Backend de limite de tentativas em memória do processo, com um balde de
+    fichas (token bucket) por chave. As chaves menos usadas são descartadas
+    quando a quantidade passa do limite, mantendo a memória limitada.
+    """
+
+    def __init__(self, max_chaves=100000):
+        self.max_chaves = max_chaves  # Quantidade máxima de chaves guardadas
+        self._baldes = OrderedDict()  # Chave -> (fichas, momento da última conta)
+        self._trava = threading.Lock()  # Protege os baldes entre threads
+
+    def consumir(self, chave, limite, janela, gastar=True):
+        """
+        Consome uma ficha do balde da chave, se houver.
+        O balde comporta 'limite' fichas e se reabastece por completo em 'janela'
+        segundos.
+        Parâmetros:
+            chave (str): Identificador limitado (IP, conta, etc.).
+            limite (int): Quantidade de tentativas permitidas na janela.
+            janela (float): Duração da janela em segundos.
+            gastar (bool): False só verifica se há ficha, sem consumi-la.
+        Retorna:
+            bool: True se a tentativa é permitida.
+        """
+        agora = time.monotonic()
+        with self._trava:
+            fichas, ultimo = self._baldes.pop(chave, (limite, agora))
+            fichas = min(limite, fichas + (agora - ultimo) * limite / janela)
+            permitido = fichas >= 1
+            if permitido and gastar:
+                fichas -= 1  # Gasta a ficha da tentativa
+            self._baldes[chave] = (fichas, agora)  # Reinsere como usada recentemente
+            while len(self._baldes) > self.max_chaves:
+                self._baldes.popitem(last=False)  # Descarta a chave menos usada
+        return permitido
+
+
+class LimitadorLogin:
+    """
+    Limita as tentativas de login e de registro por IP e os logins errados por
+    IP e conta antes de qualquer cálculo de hash de senha, para que uma rajada
+    de tentativas não ocupe todos os workers com bcrypt. Como as falhas contam
+    por IP e conta, errar a senha de alguém não bloqueia o login do próprio
+    dono em outro endereço. Mantém contadores para monitoramento.
+    """
+
+    def __init__(self, app=None, backend=None):
+        self._backend = backend  # Backend dos limites (padrão: um em memória por app)
+        self._contadores = Counter()  # Tentativas permitidas e bloqueadas
+        self._trava = threading.Lock()  # Protege os contadores entre threads
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Lê os limites das configurações da aplicação.
+        Parâmetros:
+            app (Flask): Instância da aplicação.
+        """
+        app.config.setdefault("LOGIN_TENTATIVAS_POR_IP", 20)
+        app.config.setdefault("LOGIN_TENTATIVAS_POR_CONTA", 5)
+        app.config.setdefault("LOGIN_JANELA_SEGUNDOS", 60)
+        app.extensions["limitador_login"] = self._backend or BackendLimiteMemoria()
+
+    @property
+    def backend(self):
+        """
+        Backend de limites da aplicação atual.
+        """
+        return current_app.extensions["limitador_login"]
+
+    def _contar(self, nome):
+        with self._trava:
+            self._contadores[nome] += 1
+
+    @staticmethod
+    def _chave_conta(ip, email):
+        return f"conta:{ip}:{email.strip().lower()}"
+
+    def permitir(self, ip, email=None):
+        """
+        Registra uma tentativa vinda de um IP e, no login, verifica se esse IP
+        ainda pode errar a senha da conta.
+        Parâmetros:
+            ip (str): Endereço de quem tenta.
+            email (str | None): E-mail da conta, quando a tentativa é um login.
+        Retorna:
+            bool: True se a tentativa pode prosseguir.
+        """
+        config = current_app.config
+        janela = config["LOGIN_JANELA_SEGUNDOS"]
+        if not self.backend.consumir(
+            f"ip:{ip}", config["LOGIN_TENTATIVAS_POR_IP"], janela
+        ):
+            self._contar("bloqueadas_ip")
+            return False
+        if email and not self.backend.consumir(
+            self._chave_conta(ip, email),
+            config["LOGIN_TENTATIVAS_POR_CONTA"],
+            janela,
+            gastar=False,
+        ):  # As fichas da conta só são gastas pelas falhas
+            self._contar("bloqueadas_conta")
+            return False
+        self._contar("permitidas")
+        return True
+
+    def registrar_falha(self, ip, email):
+        """
+        Registra um login errado (conta inexistente ou senha incorreta) de um IP
+        para uma conta.
+        Parâmetros:
+            ip (str): Endereço de quem tentou.
+            email (str): E-mail da conta.
+        """
+        config = current_app.config
+        self.backend.consumir(
+            self._chave_conta(ip, email),
+            config["LOGIN_TENTATIVAS_POR_CONTA"],
+            config["LOGIN_JANELA_SEGUNDOS"],
+        )
+
+    def contadores(self):
+        """
+        Retorna uma cópia dos contadores de tentativas deste processo.
+        Retorna:
+            dict[str, int]: Tentativas permitidas e bloqueadas (por IP e por conta).
+        """
+        with self._trava:
+            return {
+                "permitidas": self._contadores["permitidas"],
+                "bloqueadas_ip": self._contadores["bloqueadas_ip"],
+                "bloqueadas_conta": self._contadores["bloqueadas_conta"],
+            }
@@ -0,0 +1,106 @@
+from flask import (  # Importa funções do Flask
+    current_app,
+    render_template,
+    session,
+    stream_template,
+    stream_with_context,
+)
+from markupsafe import Markup  # Importa marcação HTML segura para os cards
+
+from app import cache_fragmentos, db  # Importa o cache de cards e o banco
+
+
+def _streaming():
+    return current_app.config["LISTAGENS_STREAMING"] and "_flashes" not in session
+
+
+class Listagem:
+    """
+    Página de uma listagem com paginação por cursor, percorrida como cards.
+    Os itens são lidos do banco em blocos (yield_per, que busca as linhas do
+    cursor aos poucos em vez de carregar todas de uma vez) e cada bloco de
+    cards é renderizado, ou buscado no cache de fragmentos, só quando a
+    iteração chega nele. Cada bloco é entregue ao template como um único
+    pedaço, seguido de um pedaço vazio que marca um ponto de envio: com a
+    renderização em streaming, o começo da página sai antes da primeira
+    leitura do banco e cada bloco sai antes da leitura do próximo. O atributo
+    proximo_cursor só fica disponível depois de todos os cards serem
+    percorridos, por isso o template deve usá-lo depois do laço.
+    """
+
+    def __init__(self, consulta, tamanho_pagina, template, nome, dependencias, cursor):
+        self.consulta = consulta  # Consulta já ordenada e filtrada pelo cursor
+        self.tamanho_pagina = tamanho_pagina  # Itens por página
+        self.template = template  # Template do card de cada item
+        self.nome = nome  # Nome da variável do item no template do card
+        self.dependencias = dependencias  # Objetos exibidos em cada card
+        self.cursor = cursor  # Função que extrai o cursor de um item
+        self.bloco = (
+            current_app.config["LISTAGENS_BLOCO"] if _streaming() else tamanho_pagina
+        )  # Itens lidos e renderizados de cada vez (a página toda, sem streaming)
+        self.proximo_cursor = None  # Cursor da próxima página, se houver
+
+    def _renderizar(self, itens):
+        return cache_fragmentos.renderizar(
+            self.template, itens, self.nome, self.dependencias
+        )  # Renderiza apenas os cards que não estão no cache
+
+    def __iter__(self):
+        yield Markup()  # Ponto de envio: o que veio antes já pode ir ao cliente
+        consulta = self.consulta.with_session(db.session())  # Sessão da geração
+        itens = []
+        ultimo = None
+        for indice, item in enumerate(
+            consulta.limit(self.tamanho_pagina + 1).yield_per(self.bloco)
+        ):  # Busca um item a mais para saber se existe próxima página
+            if indice == self.tamanho_pagina:
+                self.proximo_cursor = self.cursor(ultimo)  # Item extra: há mais
+                continue
+            itens.append(item)
+            ultimo = item
+            if len(itens) == self.bloco:
+                yield Markup().join(self._renderizar(itens))  # Cards do bloco
+                yield Markup()  # Envia o bloco antes de ler o próximo
+                itens = []
+        if itens:
+            yield Markup().join(self._renderizar(itens))
+
+
+def renderizar_listagem(template, **contexto):
+    """
+    Renderiza uma página de listagem de uma vez ou, com LISTAGENS_STREAMING,
+    como um gerador que envia o começo da página (cabeçalho e barra de
+    navegação) imediatamente e os cards à medida que são gerados. Páginas com
+    mensagens flash pendentes são sempre renderizadas de uma vez: o template
+    as retira da sessão, e a sessão só é gravada antes de o corpo ser enviado.
+    No streaming a sessão do banco usada pela view já foi encerrada quando o
+    template é gerado, então os objetos do contexto são reanexados à nova. Os
+    pedaços gerados pelo Jinja são juntados e enviados nos pontos de envio da
+    Listagem, em vez de um envio por tag ou variável do template. Nesse modo
+    os cabeçalhos Server-Timing e X-SQL-Consultas só medem o que foi feito
+    antes de o corpo começar a ser enviado.
+    Parâmetros:
+        template (str): Nome do template da página.
+        **contexto: Variáveis do template (incluindo a Listagem).
+    Retorna:
+        str | Iterator[str]: Página completa ou gerador com os seus pedaços.
+    """
+    if not _streaming():
+        return render_template(template, **contexto)
+
+    @stream_with_context
+    def gerar():
+        for valor in contexto.values():
+            if isinstance(valor, db.Model):
+                db.session.add(valor)  # Reanexa os objetos à sessão da geração
+        pendentes = []
+        for pedaco in stream_template(template, **contexto):
+            if pedaco:
+                pendentes.append(pedaco)  # Junta os pedaços pequenos do Jinja
+            elif pendentes:
+                yield "".join(pendentes)  # Ponto de envio marcado pela Listagem
+                pendentes = []
+        if pendentes:
+            yield "".join(pendentes)
+
+    return gerar()  # Mantém a requisição aberta enquanto a página é enviada
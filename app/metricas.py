@@ -0,0 +1,338 @@
+import cProfile  # Importa o profiler usado nas requisições amostradas
+import os  # Importa módulo para manipulação de caminhos e diretórios
+import random  # Importa sorteio das requisições amostradas
+import threading  # Importa primitivas de sincronização entre threads
+import time  # Importa medição do tempo
+from collections import defaultdict  # Importa dicionário com valor padrão
+
+from flask import (  # Importa funções do Flask
+    Response,
+    before_render_template,
+    current_app,
+    g,
+    request,
+    template_rendered,
+)
+from sqlalchemy import event  # Importa eventos do SQLAlchemy
+
+LIMITES_HISTOGRAMA = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)  # Limites (em segundos) das faixas do histograma de duração das requisições
+# O Python só aceita um profiler ativo por processo: com várias threads, uma
+# requisição sorteada enquanto outra está no cProfile fica sem perfil
+_TRAVA_PERFIL = threading.Lock()
+
+
+def _inicio_sql(conexao, cursor, instrucao, parametros, contexto, varias):
+    conexao.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+
+def _fim_sql(conexao, cursor, instrucao, parametros, contexto, varias):
+    duracao = time.perf_counter() - conexao.info["metricas_inicio"].pop()
+    medicao = g.get("metricas") if g else None  # Só há medição dentro de requisições
+    if medicao is not None:
+        medicao["sql_consultas"] += 1
+        medicao["sql_segundos"] += duracao
+
+
+def _inicio_template(aplicacao, template, context, **extras):
+    medicao = g.get("metricas")
+    if medicao is not None:
+        medicao["template_inicio"] = time.perf_counter()
+
+
+def _fim_template(aplicacao, template, context, **extras):
+    medicao = g.get("metricas")
+    if medicao is not None and medicao["template_inicio"] is not None:
+        medicao["template_segundos"] += time.perf_counter() - medicao["template_inicio"]
+        medicao["template_inicio"] = None
+
+
+def _parar_perfil(perfil):
+    perfil.disable()
+    _TRAVA_PERFIL.release()
+
+
+class RegistroMetricas:
+    """
+    Totais acumulados das requisições de uma aplicação, por rota, neste processo.
+    Com vários workers cada processo tem os seus totais, e o Prometheus soma as
+    séries de cada um.
+    """
+
+    def __init__(self):
+        self.requisicoes = defaultdict(int)  # (rota, status) -> quantidade
+        self.faixas = defaultdict(lambda: [0] * len(LIMITES_HISTOGRAMA))  # Histograma
+        self.totais = defaultdict(
+            lambda: {
+                "quantidade": 0,
+                "segundos": 0.0,
+                "sql_consultas": 0,
+                "sql_segundos": 0.0,
+                "template_segundos": 0.0,
+            }
+        )  # Rota -> totais de tempo e de SQL
+        self.trava = threading.Lock()  # Protege os totais entre threads
+
+    def registrar(self, rota, status, medicao, segundos):
+        """
+        Soma uma requisição aos totais da sua rota.
+        Parâmetros:
+            rota (str): Endpoint da requisição.
+            status (int): Código de status da resposta.
+            medicao (dict): Medição da requisição (SQL e templates).
+            segundos (float): Duração total da requisição.
+        """
+        with self.trava:
+            self.requisicoes[(rota, status)] += 1
+            totais = self.totais[rota]
+            totais["quantidade"] += 1
+            totais["segundos"] += segundos
+            totais["sql_consultas"] += medicao["sql_consultas"]
+            totais["sql_segundos"] += medicao["sql_segundos"]
+            totais["template_segundos"] += medicao["template_segundos"]
+            faixas = self.faixas[rota]
+            for indice, limite in enumerate(LIMITES_HISTOGRAMA):
+                if segundos <= limite:
+                    faixas[indice] += 1  # Faixas cumulativas, como no Prometheus
+
+
+class Metricas:
+    """
+    Instrumentação opcional das requisições (METRICAS_ATIVAS). Para cada
+    requisição mede o tempo total, o tempo de renderização dos templates e a
+    quantidade e o tempo das instruções SQL, devolve os valores nos cabeçalhos
+    da resposta (Server-Timing e X-SQL-Consultas) e os acumula por rota para a
+    rota /metrics, no formato de texto do Prometheus. Uma amostra das
+    requisições pode ser executada com o cProfile; as que passarem do limite
+    configurado têm o perfil gravado em disco para análise com pstats.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Liga a instrumentação à aplicação, se estiver ativada nas configurações.
+        Deve ser chamado depois de o banco de dados ser inicializado.
+        Parâmetros:
+            app (Flask): Instância da aplicação.
+        """
+        app.config.setdefault("METRICAS_ATIVAS", False)
+        app.config.setdefault("METRICAS_CABECALHOS", True)
+        app.config.setdefault("METRICAS_PERFIL_AMOSTRA", 0.0)
+        app.config.setdefault("METRICAS_PERFIL_LIMITE_MS", 500)
+        app.config.setdefault("METRICAS_PERFIL_ARQUIVOS", 50)
+        app.config.setdefault(
+            "METRICAS_PERFIL_PASTA", os.path.join(app.instance_path, "perfis")
+        )
+        if not app.config["METRICAS_ATIVAS"]:
+            return
+        from app import db  # Importa aqui para evitar importação circular
+
+        app.extensions["metricas"] = RegistroMetricas()  # Cada aplicação tem o seu
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", _inicio_sql)
+                event.listen(engine, "after_cursor_execute", _fim_sql)
+        before_render_template.connect(_inicio_template, app)
+        template_rendered.connect(_fim_template, app)
+        app.before_request(self._iniciar)
+        app.after_request(self._finalizar)
+        app.teardown_request(self._encerrar)
+        app.add_url_rule("/metrics", "metricas", self.exportar)
+
+    @property
+    def registro(self):
+        """
+        Totais da aplicação atual.
+        """
+        return current_app.extensions["metricas"]
+
+    def _iniciar(self):
+        perfil = None
+        amostra = current_app.config["METRICAS_PERFIL_AMOSTRA"]
+        if random.random() < amostra and _TRAVA_PERFIL.acquire(blocking=False):
+            perfil = cProfile.Profile()  # Requisição sorteada para o profiler
+            try:
+                perfil.enable()
+            except ValueError:  # Outra ferramenta (depurador, profiler) já ativa
+                _TRAVA_PERFIL.release()
+                perfil = None
+        g.metricas = {
+            "inicio": time.perf_counter(),
+            "sql_consultas": 0,
+            "sql_segundos": 0.0,
+            "template_inicio": None,
+            "template_segundos": 0.0,
+            "perfil": perfil,
+        }
+
+    def _finalizar(self, resposta):
+        medicao = g.pop("metricas", None)
+        if medicao is None:
+            return resposta
+        segundos = time.perf_counter() - medicao["inicio"]  # Duração total
+        rota = request.endpoint or "desconhecida"  # 404 não tem endpoint
+        if medicao["perfil"] is not None:
+            _parar_perfil(medicao["perfil"])
+            if segundos * 1000 >= current_app.config["METRICAS_PERFIL_LIMITE_MS"]:
+                self._gravar_perfil(medicao["perfil"], rota, segundos)
+        self.registro.registrar(rota, resposta.status_code, medicao, segundos)
+        if current_app.config["METRICAS_CABECALHOS"]:
+            resposta.headers["Server-Timing"] = (
+                f"total;dur={segundos * 1000:.1f}, "
+                f"sql;dur={medicao['sql_segundos'] * 1000:.1f}, "
+                f"template;dur={medicao['template_segundos'] * 1000:.1f}"
+            )  # Aparece na aba de rede das ferramentas do navegador
+            resposta.headers["X-SQL-Consultas"] = str(medicao["sql_consultas"])
+        return resposta
+
+    def _encerrar(self, erro=None):
+        medicao = g.pop("metricas", None)  # Ainda em g se _finalizar não rodou
+        if medicao is not None and medicao["perfil"] is not None:
+            _parar_perfil(medicao["perfil"])  # Libera o profiler para as próximas
+
+    def _gravar_perfil(self, perfil, rota, segundos):
+        """
+        Grava o perfil de uma requisição lenta e descarta os mais antigos além
+        de METRICAS_PERFIL_ARQUIVOS.
+        Parâmetros:
+            perfil (cProfile.Profile): Perfil da requisição.
+            rota (str): Endpoint da requisição.
+            segundos (float): Duração da requisição.
+        """
+        config = current_app.config
+        pasta = config["METRICAS_PERFIL_PASTA"]
+        os.makedirs(pasta, exist_ok=True)
+        nome = (
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{rota}-"
+            f"{segundos * 1000:.0f}ms.prof"
+        )  # Data, processo, rota e duração da requisição
+        perfil.dump_stats(os.path.join(pasta, nome))  # Abra com 'python -m pstats'
+        arquivos = sorted(
+            (os.path.join(pasta, arquivo) for arquivo in os.listdir(pasta)),
+            key=os.path.getmtime,
+        )
+        for caminho in arquivos[: -config["METRICAS_PERFIL_ARQUIVOS"]]:
+            os.remove(caminho)  # Mantém a pasta com tamanho limitado
+
+    def exportar(self):
+        """
+        Exporta os totais das requisições e os contadores dos caches e do limite
+        de login no formato de texto do Prometheus.
+        Retorna:
+            Response: Métricas em texto puro.
+        """
+        from app import (  # Contadores do processo
+            cache_usuarios,
+            compressao,
+            limitador_login,
+        )
+
+        registro = self.registro
+        with registro.trava:
+            requisicoes = sorted(registro.requisicoes.items())
+            totais = sorted((rota, dict(t)) for rota, t in registro.totais.items())
+            faixas = {rota: list(f) for rota, f in registro.faixas.items()}
+        histograma = []
+        for rota, t in totais:
+            histograma += [
+                ("_bucket", {"rota": rota, "le": limite}, quantidade)
+                for limite, quantidade in zip(LIMITES_HISTOGRAMA, faixas[rota])
+            ]
+            histograma += [
+                ("_bucket", {"rota": rota, "le": "+Inf"}, t["quantidade"]),
+                ("_sum", {"rota": rota}, t["segundos"]),
+                ("_count", {"rota": rota}, t["quantidade"]),
+            ]
+        usuarios = cache_usuarios.contadores()
+        comprimidos = compressao.contadores()
+        metricas = [
+            (
+                "comunidade_requisicoes_total",
+                "counter",
+                "Requisições atendidas por rota e status.",
+                [("", {"rota": r, "status": s}, n) for (r, s), n in requisicoes],
+            ),
+            (
+                "comunidade_requisicao_segundos",
+                "histogram",
+                "Duração das requisições por rota.",
+                histograma,
+            ),
+            (
+                "comunidade_sql_consultas_total",
+                "counter",
+                "Instruções SQL executadas por rota.",
+                [("", {"rota": rota}, t["sql_consultas"]) for rota, t in totais],
+            ),
+            (
+                "comunidade_sql_segundos_total",
+                "counter",
+                "Tempo gasto em instruções SQL por rota.",
+                [("", {"rota": rota}, t["sql_segundos"]) for rota, t in totais],
+            ),
+            (
+                "comunidade_template_segundos_total",
+                "counter",
+                "Tempo gasto renderizando templates por rota.",
+                [("", {"rota": rota}, t["template_segundos"]) for rota, t in totais],
+            ),
+            (
+                "comunidade_cache_usuarios_total",
+                "counter",
+                "Consultas ao cache de usuários por resultado.",
+                [
+                    ("", {"resultado": "acerto"}, usuarios["acertos"]),
+                    ("", {"resultado": "falha"}, usuarios["falhas"]),
+                ],
+            ),
+            (
+                "comunidade_compressao_cache_total",
+                "counter",
+                "Consultas ao cache de respostas comprimidas por resultado.",
+                [
+                    ("", {"resultado": "acerto"}, comprimidos["acertos"]),
+                    ("", {"resultado": "falha"}, comprimidos["falhas"]),
+                ],
+            ),
+            (
+                "comunidade_compressao_bytes_total",
+                "counter",
+                "Bytes das respostas comprimidas, antes e depois da compressão.",
+                [
+                    ("", {"etapa": "original"}, comprimidos["bytes_originais"]),
+                    ("", {"etapa": "enviado"}, comprimidos["bytes_enviados"]),
+                ],
+            ),
+            (
+                "comunidade_login_tentativas_total",
+                "counter",
+                "Tentativas de login e registro por resultado.",
+                [
+                    ("", {"resultado": resultado}, quantidade)
+                    for resultado, quantidade in limitador_login.contadores().items()
+                ],
+            ),
+        ]  # (nome, tipo, descrição, [(sufixo, rótulos, valor)])
+        linhas = []
+        for nome, tipo, descricao, amostras in metricas:
+            linhas.append(f"# HELP {nome} {descricao}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            for sufixo, rotulos, valor in amostras:
+                texto = ",".join(f'{chave}="{v}"' for chave, v in rotulos.items())
+                linhas.append(f"{nome}{sufixo}{{{texto}}} {valor}")
+        return Response(
+            "\n".join(linhas) + "\n", mimetype="text/plain; version=0.0.4"
+        )  # Formato de exposição de texto do Prometheus
@@ -4,23 +4,99 @@ from datetime import (  # Importa classes para manipulação de datas e fuso hor
 )
 
 from flask_login import UserMixin  # Importa classe para integração com Flask-Login
+from sqlalchemy import inspect  # Importa inspeção dos mapeamentos do SQLAlchemy
+from sqlalchemy.orm import make_transient_to_detached  # Importa estado de instância
 
-from app import (  # Importa instâncias do banco de dados e do login manager
+from app import (  # Importa instâncias do banco de dados, do login manager e do cache
+    cache_usuarios,
     db,
     login_manager,
 )
 
 
+def agora_utc():
+    """
+    Retorna o momento atual em UTC, usado nas colunas de data de alteração.
+    Retorna:
+        datetime: Data e hora atuais.
+    """
+    return datetime.now(timezone.utc)
+
+
 @login_manager.user_loader
 def load_usuario(usuario_id):
     """
     Função utilizada pelo Flask-Login para carregar o usuário pelo ID.
+    Os dados do usuário ficam em um cache curto (CacheUsuarios); em um acerto a
+    instância é montada a partir dele e anexada à sessão sem ir ao banco.
     Parâmetros:
         usuario_id (int): ID do usuário a ser carregado.
     Retorna:
         Usuario: Instância do usuário correspondente ao ID.
     """
-    return Usuario.query.get(int(usuario_id))  # Busca o usuário pelo ID no banco
+    usuario_id = int(usuario_id)
+    valores = cache_usuarios.obter(usuario_id)  # Dados do usuário em cache
+    if valores is None:
+        usuario = db.session.get(Usuario, usuario_id)  # Busca o usuário pelo ID no banco
+        if usuario is not None:
+            cache_usuarios.guardar(
+                usuario_id,
+                {
+                    atributo.key: getattr(usuario, atributo.key)
+                    for atributo in inspect(Usuario).column_attrs
+                },
+            )  # Guarda os valores das colunas para as próximas requisições
+        return usuario
+    usuario = Usuario(**valores)  # Monta a instância com os dados do cache
+    make_transient_to_detached(usuario)  # Marca como já existente no banco
+    return db.session.merge(usuario, load=False)  # Anexa à sessão sem consultar
+
+
+usuario_curso = db.Table(
+    "usuario_curso",
+    db.Column(
+        "usuario_id", db.Integer, db.ForeignKey("usuario.id"), primary_key=True
+    ),  # ID do usuário inscrito
+    db.Column(
+        "curso_id", db.Integer, db.ForeignKey("curso.id"), primary_key=True
+    ),  # ID do curso
+    db.Index(
+        "ix_usuario_curso_curso_id", "curso_id", "usuario_id"
+    ),  # Índice para buscar os inscritos de um curso
+)  # Tabela de associação entre usuários e cursos
+
+
+class Curso(db.Model):
+    """
+    Modelo que representa um curso no qual os usuários podem se inscrever.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)  # Chave primária
+    nome = db.Column(
+        db.String(100), unique=True, nullable=False, index=True
+    )  # Nome único do curso
+
+    @classmethod
+    def obter_ou_criar(cls, nomes):
+        """
+        Busca os cursos pelos nomes, criando os que ainda não existem.
+        Parâmetros:
+            nomes (list[str]): Nomes dos cursos.
+        Retorna:
+            list[Curso]: Cursos na mesma ordem dos nomes recebidos.
+        """
+        if not nomes:
+            return []
+        existentes = {
+            curso.nome: curso for curso in cls.query.filter(cls.nome.in_(nomes))
+        }  # Cursos já cadastrados, indexados pelo nome
+        cursos = []
+        for nome in nomes:
+            if nome not in existentes:
+                existentes[nome] = cls(nome=nome)  # Cria o curso que falta
+                db.session.add(existentes[nome])
+            cursos.append(existentes[nome])
+        return cursos
 
 
 class Usuario(db.Model, UserMixin):
@@ -34,12 +110,20 @@ class Usuario(db.Model, UserMixin):
     email = db.Column(db.String(120), unique=True, nullable=False)  # E-mail único
     senha = db.Column(db.String(200), nullable=False)  # Senha (hash)
     foto_perfil = db.Column(
-        db.String(200), nullable=True, default="default.jpg"
-    )  # Foto de perfil
-    cursos = db.Column(db.String(200), nullable=True, default="")  # Cursos do usuário
+        db.String(200), nullable=True, default="default.jpg", index=True
+    )  # Foto de perfil (indexada: a limpeza procura quem ainda usa uma imagem)
+    atualizado_em = db.Column(
+        db.DateTime, nullable=False, default=agora_utc, onupdate=agora_utc, index=True
+    )  # Última alteração dos dados exibidos do usuário (versão para o cache HTTP)
+    cursos = db.relationship(
+        "Curso",
+        secondary=usuario_curso,
+        order_by="Curso.id",
+        backref=db.backref("usuarios", lazy="dynamic"),
+    )  # Cursos do usuário
     post = db.relationship(
-        "Post", backref="autor", lazy=True
-    )  # Relacionamento com posts
+        "Post", backref="autor", lazy="dynamic"
+    )  # Posts do usuário, como consulta (nunca carregados todos de uma vez)
 
     def contar_posts(self):
         """
@@ -57,12 +141,21 @@ class Post(db.Model):
     Modelo que representa um post no banco de dados.
     """
 
+    __table_args__ = (
+        db.Index(
+            "ix_post_usuario_id_id", "usuario_id", "id"
+        ),  # Posts de um autor em ordem (contagem, perfil e timeline)
+    )
+
     id = db.Column(db.Integer, primary_key=True)  # Chave primária
     titulo = db.Column(db.String(100), nullable=False)  # Título do post
     conteudo = db.Column(db.Text, nullable=False)  # Conteúdo do post
     data_postagem = db.Column(
-        db.DateTime, nullable=False, default=datetime.now(timezone.utc)
+        db.DateTime, nullable=False, default=datetime.now(timezone.utc), index=True
     )  # Data e hora da postagem
+    data_edicao = db.Column(
+        db.DateTime, nullable=False, default=agora_utc, onupdate=agora_utc, index=True
+    )  # Data e hora da última edição (versão para o cache HTTP)
     usuario_id = db.Column(
         db.Integer, db.ForeignKey("usuario.id"), nullable=False
     )  # ID do autor (chave estrangeira)
@@ -1,13 +1,12 @@
-import os  # Importa módulo para manipulação de caminhos e diretórios
-import secrets  # Importa módulo para geração de tokens seguros
-
 from flask import (  # Importa funções do Flask
+    Blueprint,
     abort,
     current_app,
     flash,
     redirect,
     render_template,
     request,
+    send_from_directory,
     url_for,
 )
 from flask_login import (  # Importa funções de autenticação do Flask-Login
@@ -16,76 +15,261 @@ from flask_login import (  # Importa funções de autenticação do Flask-Login
     login_user,
     logout_user,
 )
-from PIL import Image  # Importa biblioteca para manipulação de imagens
-from werkzeug.utils import (
-    secure_filename,  # Importa função para nomes de arquivos seguros
+from sqlalchemy import func  # Importa funções SQL (COUNT, etc.)
+from sqlalchemy.orm import (  # Importa carregamento antecipado de relações
+    joinedload,
+    selectinload,
 )
 
-from app import app, bcrypt, db  # Importa instâncias do app, bcrypt e banco de dados
+from app import (  # Importa instâncias do bcrypt, banco de dados e caches
+    bcrypt,
+    cache_fragmentos,
+    cache_usuarios,
+    db,
+    estaticos,
+    limitador_login,
+)
+from app.banco import escrever  # Importa as escritas com nova tentativa
+from app.busca import (  # Importa a busca textual de posts
+    buscar_posts,
+    indexar_post,
+    remover_post,
+)
+from app.condicional import (  # Importa as respostas condicionais (ETag)
+    RespostaCondicional,
+    pagina_estatica,
+    versao_dados,
+)
 from app.forms import (  # Importa formulários
     CriarPostForm,
     EditarPerfilForm,
     LoginForm,
     RegistrarForm,
 )
-from app.models import Post, Usuario  # Importa modelos do banco de dados
+from app.imagens import (  # Importa o processamento de fotos de perfil
+    agendar_foto_perfil,
+    pasta_imagens,
+    url_foto,
+)
+from app.leitura import somente_leitura  # Importa o roteamento das leituras
+from app.listagens import (  # Importa a renderização das listagens
+    Listagem,
+    renderizar_listagem,
+)
+from app.models import (  # Importa modelos do banco de dados
+    Curso,
+    Post,
+    Usuario,
+    agora_utc,
+    usuario_curso,
+)
+
+principal = Blueprint("principal", __name__)  # Blueprint com as páginas do site
+
+
+def dependencias_card_post(post):
+    """
+    Lista os objetos exibidos no card de um post, usados na chave do cache.
+    Parâmetros:
+        post (Post): Post do card.
+    Retorna:
+        list[tuple[str, int]]: Pares (tipo, id) do post e do seu autor.
+    """
+    return [("post", post.id), ("usuario", post.usuario_id)]
+
+
+def dependencias_card_usuario(linha):
+    """
+    Lista os objetos exibidos no card de um usuário, usados na chave do cache.
+    Parâmetros:
+        linha (tuple[Usuario, int]): Usuário e a sua quantidade de posts.
+    Retorna:
+        list[tuple[str, int]]: Par (tipo, id) do usuário.
+    """
+    return [("usuario", linha[0].id)]
 
 
-@app.route("/")
+@principal.route("/")
+@somente_leitura  # Consultas no banco de leitura, se configurado
 def home():
     """
-    Renderiza a página inicial com a lista de posts.
-    Consulta todos os posts do banco de dados, ordenados do mais recente para o mais antigo,
-    e passa para o template 'home.html' junto com o usuário atual.
+    Renderiza a página inicial com o feed de posts paginado.
+    Usa paginação por cursor (keyset) sobre Post.id: o parâmetro 'antes' indica o
+    último ID exibido na página anterior, de modo que cada página custa o mesmo
+    independentemente do tamanho da tabela. Os autores são carregados na mesma
+    consulta (joinedload), evitando uma consulta extra por post no template.
+    O parâmetro opcional 'curso' restringe o feed aos autores inscritos no curso.
+    Os cards dos posts vêm do cache de fragmentos sempre que possível, e quem já
+    tem a versão atual da página recebe 304 sem que ela seja gerada. Com
+    LISTAGENS_STREAMING a página é enviada aos poucos (ver app.listagens).
     Retorna:
         Response: Página HTML renderizada para a rota inicial.
     """
-    posts = Post.query.order_by(
+    condicional = RespostaCondicional(*versao_dados())  # Versão dos posts e autores
+    if condicional.nao_modificado:
+        return condicional.responder()  # O cliente já tem esta página
+    tamanho_pagina = current_app.config["POSTS_POR_PAGINA"]  # Posts por página
+    antes = request.args.get("antes", type=int)  # Cursor da página atual
+    curso = request.args.get("curso")  # Curso usado como filtro (opcional)
+    consulta = Post.query.options(
+        joinedload(Post.autor).selectinload(Usuario.cursos)
+    ).order_by(
         Post.id.desc()
-    )  # Busca todos os posts ordenados do mais novo para o mais antigo
-    return render_template(
-        "home.html", posts=posts, usuario=current_user
-    )  # Renderiza o template passando os posts e o usuário
+    )  # Posts do mais novo para o mais antigo, já com o autor e seus cursos
+    if antes is not None:
+        consulta = consulta.filter(Post.id < antes)  # Continua após o cursor
+    if curso:
+        consulta = (
+            consulta.join(
+                usuario_curso, usuario_curso.c.usuario_id == Post.usuario_id
+            )
+            .join(Curso, Curso.id == usuario_curso.c.curso_id)
+            .filter(Curso.nome == curso)
+        )  # Mantém apenas os posts de autores inscritos no curso
+    cards = Listagem(
+        consulta,
+        tamanho_pagina,
+        "_card_post.html",
+        "post",
+        dependencias_card_post,
+        lambda post: post.id,
+    )  # Cards dos posts, lidos e renderizados enquanto o template é gerado
+    return condicional.responder(
+        renderizar_listagem("home.html", cards=cards, usuario=current_user, curso=curso)
+    )  # Renderiza o template passando os cards, o usuário e o curso
 
 
-@app.route("/contato")
+@principal.route("/contato")
 def contato():
     """
-    Renderiza a página de contato.
+    Renderiza a página de contato, que é estática: o HTML é gerado uma vez por
+    processo e respondido com ETag.
+    Retorna:
+        Response: Página HTML de contato ou resposta 304.
+    """
+    return pagina_estatica("contato.html")  # Renderiza o template de contato
+
+
+@principal.route("/busca")
+@somente_leitura
+def busca():
+    """
+    Busca posts pelo título e conteúdo usando o índice FTS5.
+    Os resultados são ordenados por relevância, paginados pelo parâmetro 'pagina'
+    e exibem os termos encontrados destacados.
     Retorna:
-        str: Template HTML renderizado para a página de contato.
+        Response: Página HTML renderizada com os resultados da busca.
     """
-    return render_template("contato.html")  # Renderiza o template de contato
+    texto = request.args.get("q", "").strip()  # Texto digitado na busca
+    pagina = max(request.args.get("pagina", 1, type=int), 1)  # Página atual
+    resultados, tem_proxima = buscar_posts(
+        texto, pagina, current_app.config["BUSCA_POR_PAGINA"]
+    )  # Resultados da página atual
+    return render_template(
+        "busca.html",
+        texto=texto,
+        pagina=pagina,
+        resultados=resultados,
+        tem_proxima=tem_proxima,
+    )  # Renderiza os resultados
 
 
-@app.route("/usuarios")
+@principal.route("/usuarios")
+@somente_leitura
 @login_required  # Exige que o usuário esteja logado para acessar
 def usuarios():
     """
-    Exibe todos os usuários cadastrados.
-    Consulta todos os usuários do banco de dados e renderiza o template 'usuarios.html',
-    passando a lista de usuários como 'lista_usuarios'.
+    Exibe os usuários cadastrados de forma paginada.
+    Uma única consulta agrupada traz os usuários da página junto com a quantidade
+    de posts de cada um, em vez de um COUNT por usuário no template. A paginação
+    é por cursor sobre Usuario.id (parâmetro 'depois') e o parâmetro opcional
+    'curso' filtra os usuários inscritos em um curso. Os cards vêm do cache de
+    fragmentos sempre que possível, e quem já tem a versão atual da página
+    recebe 304 sem que ela seja gerada. Com LISTAGENS_STREAMING a página é
+    enviada aos poucos (ver app.listagens).
     Retorna:
         Response: Página HTML renderizada com a lista de usuários.
     """
-    lista_usuarios = Usuario.query.all()  # Busca todos os usuários cadastrados
-    return render_template(
-        "usuarios.html", lista_usuarios=lista_usuarios
+    condicional = RespostaCondicional(*versao_dados())  # Versão dos usuários e posts
+    if condicional.nao_modificado:
+        return condicional.responder()  # O cliente já tem esta página
+    tamanho_pagina = current_app.config["USUARIOS_POR_PAGINA"]  # Usuários por página
+    depois = request.args.get("depois", type=int)  # Cursor da página atual
+    curso = request.args.get("curso")  # Curso usado como filtro (opcional)
+    consulta = (
+        db.session.query(Usuario, func.count(Post.id))
+        .options(selectinload(Usuario.cursos))
+        .outerjoin(Post, Post.usuario_id == Usuario.id)
+        .group_by(Usuario.id)
+        .order_by(Usuario.id)
+    )  # Usuários com a contagem de posts em uma só consulta
+    if depois is not None:
+        consulta = consulta.filter(Usuario.id > depois)  # Continua após o cursor
+    if curso:
+        consulta = (
+            consulta.join(usuario_curso, usuario_curso.c.usuario_id == Usuario.id)
+            .join(Curso, Curso.id == usuario_curso.c.curso_id)
+            .filter(Curso.nome == curso)
+        )  # Mantém apenas os usuários inscritos no curso (usa o índice por curso)
+    cards = Listagem(
+        consulta,
+        tamanho_pagina,
+        "_card_usuario.html",
+        "linha",
+        dependencias_card_usuario,
+        lambda linha: linha[0].id,
+    )  # Cards dos usuários, lidos e renderizados enquanto o template é gerado
+    return condicional.responder(
+        renderizar_listagem("usuarios.html", cards=cards, curso=curso)
     )  # Renderiza o template com a lista
 
 
-@app.route("/login-registrar", methods=["GET", "POST"])
+def precisa_novo_hash(senha_hash):
+    """
+    Verifica se o hash de uma senha foi gerado com um custo (rounds do bcrypt)
+    diferente do configurado em BCRYPT_LOG_ROUNDS.
+    Parâmetros:
+        senha_hash (str): Hash bcrypt no formato '$2b$<custo>$...'.
+    Retorna:
+        bool: True se o hash deve ser refeito.
+    """
+    partes = senha_hash.split("$")
+    custo = int(partes[2]) if len(partes) > 3 and partes[2].isdigit() else None
+    return custo != current_app.config["BCRYPT_LOG_ROUNDS"]
+
+
+@principal.route("/login-registrar", methods=["GET", "POST"])
 def login_registrar():
     """
     Gerencia o login e o registro de usuários.
     Processa os formulários de login e registro. Se o login for bem-sucedido, autentica o usuário.
     Se o registro for bem-sucedido, cria uma nova conta de usuário.
+    Tentativas acima do limite por IP, ou de um IP que já errou demais a senha
+    de uma conta, são recusadas (429) antes de qualquer cálculo de hash, e
+    senhas com custo diferente do configurado são refeitas no login.
     Retorna:
         Response: Página HTML renderizada para login/registro ou redireciona em caso de sucesso.
     """
     form_login = LoginForm()  # Instancia o formulário de login
     form_registrar = RegistrarForm()  # Instancia o formulário de registro
 
+    # Recusa o excesso de tentativas antes de qualquer trabalho com bcrypt
+    if request.method == "POST" and not limitador_login.permitir(
+        request.remote_addr,
+        request.form.get("email") if "submit_login" in request.form else None,
+    ):
+        flash(
+            "Muitas tentativas. Aguarde um pouco e tente novamente.", "alert-danger"
+        )
+        return (
+            render_template(
+                "login_registrar.html",
+                form_login=form_login,
+                form_registrar=form_registrar,
+            ),
+            429,
+        )
+
     # Verifica se o formulário de login foi submetido e é válido
     if form_login.validate_on_submit() and "submit_login" in request.form:
         usuario = Usuario.query.filter_by(
@@ -93,6 +277,16 @@ def login_registrar():
         ).first()  # Busca usuário pelo e-mail
         # Verifica se o usuário existe e se a senha está correta usando bcrypt
         if usuario and bcrypt.check_password_hash(usuario.senha, form_login.senha.data):
+            if precisa_novo_hash(usuario.senha):
+                senha_hash = bcrypt.generate_password_hash(
+                    form_login.senha.data
+                ).decode("utf-8")  # Refaz o hash com o custo configurado
+
+                def salvar_hash():
+                    usuario.senha = senha_hash
+
+                escrever(salvar_hash)  # Salva o novo hash
+                cache_usuarios.invalidar(usuario.id)  # Descarta os dados antigos
             login_user(
                 usuario, remember=form_login.lembrar_me.data
             )  # Realiza login do usuário
@@ -106,62 +300,117 @@ def login_registrar():
             if params_next:
                 return redirect(params_next)
             else:
-                return redirect(url_for("home"))
+                return redirect(url_for("principal.home"))
         else:
+            limitador_login.registrar_falha(
+                request.remote_addr, form_login.email.data
+            )  # Conta o erro deste IP para esta conta
             flash("Email ou senha incorretos. Tente novamente.", "alert-danger")
     # Verifica se o formulário de registro foi submetido e é válido
     if form_registrar.validate_on_submit() and "submit_registrar" in request.form:
         senha_hash = bcrypt.generate_password_hash(form_registrar.senha.data).decode(
             "utf-8"
         )  # Gera hash da senha
-        usuario = Usuario(
-            username=form_registrar.username.data,
-            email=form_registrar.email.data,
-            senha=senha_hash,
-            cursos="",
-        )  # Cria novo usuário
-        db.session.add(usuario)  # Adiciona usuário ao banco
-        db.session.commit()  # Salva no banco
+
+        def salvar_usuario():
+            usuario = Usuario(
+                username=form_registrar.username.data,
+                email=form_registrar.email.data,
+                senha=senha_hash,
+            )  # Cria novo usuário
+            db.session.add(usuario)  # Adiciona usuário ao banco
+
+        escrever(salvar_usuario)  # Salva no banco
         flash(
             f"Conta criada com sucesso para {form_registrar.email.data}!",
             "alert-success",
         )
-        return redirect(url_for("home"))
+        return redirect(url_for("principal.home"))
     # Renderiza a página de login/registro com os formulários
     return render_template(
         "login_registrar.html", form_login=form_login, form_registrar=form_registrar
     )
 
 
-@app.route("/sair")
+@principal.route("/sair")
 def sair():
     """
     Faz logout do usuário atual e redireciona para a página inicial.
     Retorna:
         Response: Redirecionamento para a página inicial após logout.
     """
+    if current_user.is_authenticated:
+        cache_usuarios.invalidar(current_user.id)  # Descarta o usuário do cache
     logout_user()  # Realiza logout
     flash("Você saiu com sucesso.", "alert-success")  # Mensagem de sucesso
-    return redirect(url_for("home"))  # Redireciona para home
+    return redirect(url_for("principal.home"))  # Redireciona para home
 
 
-@app.route("/perfil")
+def renderizar_perfil(usuario):
+    """
+    Renderiza o perfil de um usuário com a sua timeline de posts paginada.
+    A paginação é por cursor sobre (usuario_id, id) (parâmetro 'antes'), feita
+    pela consulta do relacionamento dinâmico Usuario.post e atendida pelo
+    índice ix_post_usuario_id_id, então cada página carrega apenas os seus
+    posts, por mais posts que o autor tenha. Quem já tem a versão atual da
+    página recebe 304 sem que ela seja gerada.
+    Parâmetros:
+        usuario (Usuario): Dono do perfil.
+    Retorna:
+        Response: Página HTML do perfil ou resposta 304.
+    """
+    condicional = RespostaCondicional(*versao_dados())  # Versão dos posts e autores
+    if condicional.nao_modificado:
+        return condicional.responder()  # O cliente já tem esta página
+    tamanho_pagina = current_app.config["POSTS_POR_PAGINA"]  # Posts por página
+    antes = request.args.get("antes", type=int)  # Cursor da página atual
+    consulta = usuario.post.order_by(Post.id.desc())  # Posts do autor, mais novos antes
+    if antes is not None:
+        consulta = consulta.filter(Post.id < antes)  # Continua após o cursor
+    cards = Listagem(
+        consulta,
+        tamanho_pagina,
+        "_card_post.html",
+        "post",
+        dependencias_card_post,
+        lambda post: post.id,
+    )  # Cards da timeline, lidos e renderizados enquanto o template é gerado
+    return condicional.responder(
+        renderizar_listagem(
+            "perfil.html",
+            foto_perfil=url_foto(usuario.foto_perfil),
+            usuario=usuario,
+            cards=cards,
+        )
+    )  # Renderiza o perfil com a página da timeline
+
+
+@principal.route("/perfil")
+@somente_leitura
 @login_required
 def perfil():
     """
-    Renderiza a página de perfil do usuário atual.
+    Renderiza a página de perfil do usuário atual, com os seus posts.
     Retorna:
         Response: Página HTML renderizada do perfil do usuário.
     """
-    foto_perfil = url_for(
-        "static", filename=f"imagens/{current_user.foto_perfil}"
-    )  # Monta o caminho da foto de perfil
-    return render_template(
-        "perfil.html", foto_perfil=foto_perfil, usuario=current_user
-    )  # Renderiza o perfil
+    return renderizar_perfil(current_user)  # Renderiza o próprio perfil
+
+
+@principal.route("/usuario/<int:usuario_id>")
+@somente_leitura
+def perfil_publico(usuario_id):
+    """
+    Renderiza o perfil público de um usuário, com os seus posts.
+    Parâmetros:
+        usuario_id (int): ID do usuário.
+    Retorna:
+        Response: Página HTML renderizada do perfil ou erro 404.
+    """
+    return renderizar_perfil(db.get_or_404(Usuario, usuario_id))  # Perfil do usuário
 
 
-@app.route("/post/criar", methods=["GET", "POST"])
+@principal.route("/post/criar", methods=["GET", "POST"])
 @login_required
 def criar_post():
     """
@@ -172,44 +421,61 @@ def criar_post():
     """
     form = CriarPostForm()  # Instancia o formulário de criação de post
     if form.validate_on_submit():  # Verifica se o formulário foi submetido e é válido
-        post = Post(
-            titulo=form.titulo.data,
-            conteudo=form.conteudo.data,
-            autor=current_user,
-        )  # Cria novo post
-        db.session.add(post)  # Adiciona ao banco
-        db.session.commit()  # Salva no banco
+
+        def salvar_post():
+            post = Post(
+                titulo=form.titulo.data,
+                conteudo=form.conteudo.data,
+                autor=current_user,
+            )  # Cria novo post
+            db.session.add(post)  # Adiciona ao banco
+            db.session.flush()  # Gera o ID do post
+            indexar_post(post)  # Adiciona o post ao índice de busca
+
+        escrever(salvar_post)  # Salva no banco
+        cache_fragmentos.invalidar(
+            "usuario", current_user.id
+        )  # A quantidade de posts do autor mudou
         flash("Post criado com sucesso!", "alert-success")
-        return redirect(url_for("home"))  # Redireciona para home
+        return redirect(url_for("principal.home"))  # Redireciona para home
     return render_template(
         "criar_post.html", form=form, usuario=current_user
     )  # Renderiza o formulário
 
 
-def salvar_imagem(imagem):
+@principal.route("/imagens/<nome_arquivo>")
+def imagem(nome_arquivo):
+    """
+    Serve uma variante de foto de perfil armazenada pelo hash do seu conteúdo.
+    Como o nome muda sempre que o conteúdo muda, a resposta pode ser guardada
+    indefinidamente por navegadores e CDNs; o ETag é o próprio nome do arquivo.
+    Parâmetros:
+        nome_arquivo (str): Nome do arquivo da variante.
+    Retorna:
+        Response: Arquivo da imagem com cabeçalhos de cache imutável.
+    """
+    resposta = send_from_directory(
+        pasta_imagens(),
+        nome_arquivo,
+        max_age=current_app.config["IMAGENS_CACHE_SEGUNDOS"],
+        etag=nome_arquivo.rsplit(".", 1)[0],
+    )  # Envia o arquivo respondendo 304 quando o ETag coincide
+    resposta.cache_control.public = True
+    resposta.cache_control.immutable = True  # O conteúdo de um nome nunca muda
+    return resposta
+
+
+@principal.route("/estaticos/<path:nome_arquivo>")
+def estatico(nome_arquivo):
     """
-    Salva uma imagem enviada pelo usuário na pasta static/imagens após redimensionar.
+    Serve um arquivo estático versionado pelo conteúdo (gerado pelo comando
+    'flask gerar-estaticos'), na variante pré-comprimida aceita pelo navegador.
     Parâmetros:
-        imagem (FileStorage): Arquivo de imagem enviado pelo usuário.
+        nome_arquivo (str): Nome versionado do arquivo.
     Retorna:
-        str: Nome do arquivo da imagem salva.
-    """
-    # Gera um nome seguro para o arquivo e uma string aleatória para evitar conflitos
-    nome_seguro = secure_filename(imagem.filename)
-    extensao = nome_seguro.rsplit(".", 1)[1].lower()
-    nome_arquivo = f"{secrets.token_hex(8)}.{extensao}"  # Gera nome único
-    caminho_pasta = os.path.join(
-        current_app.root_path, "static/imagens"
-    )  # Caminho da pasta de imagens
-    tamanho_maximo = (400, 400)  # Define tamanho máximo
-    imagem = Image.open(imagem)  # Abre a imagem
-    imagem.thumbnail(tamanho_maximo)  # Redimensiona a imagem para no máximo 400x400
-    caminho_arquivo = os.path.join(
-        caminho_pasta, nome_arquivo
-    )  # Caminho completo do arquivo
-    os.makedirs(caminho_pasta, exist_ok=True)  # Garante que a pasta existe
-    imagem.save(caminho_arquivo)  # Salva a imagem
-    return nome_arquivo  # Retorna o nome do arquivo salvo
+        Response: Arquivo com cabeçalhos de cache imutável.
+    """
+    return estaticos.servir(nome_arquivo)
 
 
 def atualizar_cursos(form):
@@ -218,7 +484,7 @@ def atualizar_cursos(form):
     Parâmetros:
         form (FlaskForm): Formulário contendo os campos de cursos.
     Retorna:
-        str: String com os cursos selecionados separados por ponto e vírgula.
+        list[Curso]: Cursos selecionados no formulário.
     """
     lista_cursos = []
     # Percorre todos os campos do formulário e verifica se o campo é de curso e está selecionado
@@ -228,10 +494,10 @@ def atualizar_cursos(form):
                 lista_cursos.append(
                     campo.label.text
                 )  # Adiciona o nome do curso selecionado
-    return ";".join(lista_cursos)  # Retorna os cursos separados por ponto e vírgula
+    return Curso.obter_ou_criar(lista_cursos)  # Retorna os cursos selecionados
 
 
-@app.route("/perfil/editar/", methods=["GET", "POST"])
+@principal.route("/perfil/editar/", methods=["GET", "POST"])
 @login_required
 def editar_perfil():
     """
@@ -242,36 +508,45 @@ def editar_perfil():
     """
     form = EditarPerfilForm()  # Instancia o formulário de edição de perfil
     if form.validate_on_submit():  # Se o formulário foi submetido e é válido
-        current_user.username = form.username.data  # Atualiza nome de usuário
-        current_user.email = form.email.data  # Atualiza email
+
+        def salvar_perfil():
+            current_user.username = form.username.data  # Atualiza nome de usuário
+            current_user.email = form.email.data  # Atualiza email
+            current_user.cursos = atualizar_cursos(form)  # Atualiza cursos selecionados
+            current_user.atualizado_em = agora_utc()  # Os cursos não mudam a linha
+
+        escrever(salvar_perfil)  # Salva tudo em uma única transação
+        cache_fragmentos.invalidar("usuario", current_user.id)  # Cards do usuário
+        cache_usuarios.invalidar(current_user.id)  # Dados do usuário em cache
         if form.foto_perfil.data:  # Se foi enviada nova foto de perfil
-            current_user.foto_perfil = salvar_imagem(
-                form.foto_perfil.data
-            )  # Salva a imagem e atualiza o campo
-        db.session.commit()  # Salva alterações no banco
-        current_user.cursos = atualizar_cursos(form)  # Atualiza cursos selecionados
-        db.session.commit()  # Salva novamente
-        flash("Perfil atualizado com sucesso!", "alert-success")
-        return redirect(url_for("perfil"))  # Redireciona para o perfil
+            agendar_foto_perfil(
+                current_user.id, form.foto_perfil.data
+            )  # Processa a imagem em segundo plano e depois atualiza o campo
+            flash(
+                "Perfil atualizado com sucesso! A nova foto aparecerá em instantes.",
+                "alert-success",
+            )
+        else:
+            flash("Perfil atualizado com sucesso!", "alert-success")
+        return redirect(url_for("principal.perfil"))  # Redireciona para o perfil
     elif request.method == "GET":
         # Preenche o formulário com os dados atuais do usuário
         form.username.data = current_user.username
         form.email.data = current_user.email
         form.foto_perfil.data = current_user.foto_perfil
         # Marca os cursos já selecionados pelo usuário
+        cursos_usuario = {curso.nome for curso in current_user.cursos}
         for campo in form:
-            for curso in current_user.cursos.split(";"):
-                if curso == campo.label.text:
-                    campo.data = True
-    foto_perfil = url_for(
-        "static", filename=f"imagens/{current_user.foto_perfil}"
-    )  # Caminho da foto de perfil
+            if "curso_" in campo.name:
+                campo.data = campo.label.text in cursos_usuario
+    foto_perfil = url_foto(current_user.foto_perfil)  # Caminho da foto de perfil
     return render_template(
         "editar_perfil.html", foto_perfil=foto_perfil, form=form, usuario=current_user
     )  # Renderiza o formulário
 
 
-@app.route("/post/<int:post_id>", methods=["GET", "POST"])
+@principal.route("/post/<int:post_id>", methods=["GET", "POST"])
+@somente_leitura
 @login_required
 def post(post_id):
     """
@@ -289,19 +564,32 @@ def post(post_id):
             form.titulo.data = post.titulo  # Preenche o campo título
             form.conteudo.data = post.conteudo  # Preenche o campo conteúdo
         elif form.validate_on_submit():
-            post.titulo = form.titulo.data  # Atualiza título
-            post.conteudo = form.conteudo.data  # Atualiza conteúdo
-            db.session.commit()  # Salva alterações
+
+            def salvar_post():
+                post.titulo = form.titulo.data  # Atualiza título
+                post.conteudo = form.conteudo.data  # Atualiza conteúdo
+                indexar_post(post)  # Atualiza o post no índice de busca
+
+            escrever(salvar_post)  # Salva alterações
+            cache_fragmentos.invalidar("post", post.id)  # Card do post
             flash("Post atualizado com sucesso!", "alert-success")
-            return redirect(url_for("home"))
+            return redirect(url_for("principal.home"))
     else:
-        form = None  # Usuário não é autor, não pode editar
+        condicional = RespostaCondicional(
+            (post.data_edicao, post.autor.atualizado_em),
+            max(post.data_edicao, post.autor.atualizado_em),
+        )  # Versão do post e do autor exibido
+        if condicional.nao_modificado:
+            return condicional.responder()  # O cliente já tem esta página
+        return condicional.responder(
+            render_template("post.html", post=post, usuario=current_user, form=None)
+        )  # Usuário não é autor, não pode editar
     return render_template(
         "post.html", post=post, usuario=current_user, form=form
     )  # Renderiza o post
 
 
-@app.route("/post/<int:post_id>/deletar", methods=["GET", "POST"])
+@principal.route("/post/<int:post_id>/deletar", methods=["GET", "POST"])
 @login_required
 def deletar_post(post_id):
     """
@@ -314,9 +602,18 @@ def deletar_post(post_id):
     post = Post.query.get(post_id)  # Busca o post pelo ID
     # Só permite deletar se o usuário for o autor do post
     if current_user == post.autor:
-        db.session.delete(post)  # Deleta o post
-        db.session.commit()  # Salva no banco
+
+        def apagar_post():
+            db.session.delete(post)  # Deleta o post
+            remover_post(post_id)  # Remove o post do índice de busca
+            current_user.atualizado_em = agora_utc()  # A contagem de posts mudou
+
+        escrever(apagar_post)  # Salva no banco
+        cache_fragmentos.invalidar("post", post_id)  # Card do post
+        cache_fragmentos.invalidar(
+            "usuario", current_user.id
+        )  # A quantidade de posts do autor mudou
         flash("Post deletado com sucesso!", "alert-danger")
-        return redirect(url_for("home"))
+        return redirect(url_for("principal.home"))
     else:
         abort(403)  # Retorna erro 403 se não for o autor
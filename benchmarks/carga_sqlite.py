@@ -0,0 +1,189 @@
+"""
+Teste de carga do SQLite: mede a vazão de leituras da página inicial enquanto
+outros processos criam posts sem parar, com e sem os ajustes de conexão (WAL,
+PRAGMAs e novas tentativas de escrita).
+
+Uso:
+    python -m benchmarks.carga_sqlite [--leitores 4] [--escritores 2] [--segundos 10]
+"""
+
+import argparse  # Importa leitura dos argumentos da linha de comando
+import json  # Importa serialização do relatório
+import multiprocessing  # Importa processos, como os workers do gunicorn
+import os  # Importa módulo para montar caminhos
+import tempfile  # Importa criação da pasta temporária do banco
+import time  # Importa medição do tempo
+
+from app import bcrypt, create_app, db  # Importa a fábrica da aplicação e o banco
+from app.models import Post, Usuario  # Importa os modelos
+
+POSTS_INICIAIS = 2000  # Posts criados antes da medição
+
+
+def _criar_app(caminho_banco, ajustes):
+    """
+    Cria uma aplicação apontando para o arquivo de banco compartilhado.
+    Parâmetros:
+        caminho_banco (str): Caminho do arquivo SQLite.
+        ajustes (bool): Se os PRAGMAs e o WAL devem ser aplicados.
+    Retorna:
+        Flask: Aplicação configurada.
+    """
+    return create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{caminho_banco}",
+            "SQLALCHEMY_ENGINE_OPTIONS": {},
+            "SQLALCHEMY_BINDS": {},  # Sem banco de leitura
+            "WTF_CSRF_ENABLED": False,  # Formulários sem token CSRF
+            "BCRYPT_LOG_ROUNDS": 4,  # Custo mínimo do bcrypt
+            "SQLITE_AJUSTES": ajustes,
+            "ESCRITA_TENTATIVAS": 5 if ajustes else 1,
+            "SQLITE_BUSY_TIMEOUT_MS": 5000,
+            "CACHE_FRAGMENTOS_CAMINHO": os.path.join(
+                os.path.dirname(caminho_banco), "fragmentos.db"
+            ),  # Versões dos cards compartilhadas pelos processos, como no gunicorn
+        }
+    )
+
+
+def _preparar_banco(caminho_banco, ajustes):
+    """
+    Cria as tabelas, um usuário e os posts iniciais.
+    Parâmetros:
+        caminho_banco (str): Caminho do arquivo SQLite.
+        ajustes (bool): Se os PRAGMAs e o WAL devem ser aplicados.
+    """
+    app = _criar_app(caminho_banco, ajustes)
+    with app.app_context():
+        db.create_all()
+        usuario = Usuario(
+            username="carga",
+            email="carga@exemplo.com",
+            senha=bcrypt.generate_password_hash("segredo").decode("utf-8"),
+        )
+        db.session.add(usuario)
+        db.session.flush()
+        db.session.add_all(
+            Post(titulo=f"Post {i}", conteudo="texto " * 50, usuario_id=usuario.id)
+            for i in range(POSTS_INICIAIS)
+        )
+        db.session.commit()
+
+
+def _entrar(cliente):
+    """
+    Faz login do usuário de carga no cliente de teste.
+    Parâmetros:
+        cliente (FlaskClient): Cliente de teste da aplicação.
+    """
+    cliente.post(
+        "/login-registrar",
+        data={"email": "carga@exemplo.com", "senha": "segredo", "submit_login": "1"},
+    )
+
+
+def _trabalhar(caminho_banco, ajustes, papel, segundos, fila):
+    """
+    Processo de carga: lê a página inicial ou cria posts até o tempo acabar.
+    Parâmetros:
+        caminho_banco (str): Caminho do arquivo SQLite.
+        ajustes (bool): Se os PRAGMAs e o WAL devem ser aplicados.
+        papel (str): 'leitor' ou 'escritor'.
+        segundos (float): Duração da medição.
+        fila (multiprocessing.Queue): Fila onde o resultado é entregue.
+    """
+    app = _criar_app(caminho_banco, ajustes)
+    cliente = app.test_client()
+    _entrar(cliente)
+    ok = erros = 0
+    latencias = []
+    fim = time.perf_counter() + segundos
+    while time.perf_counter() < fim:
+        inicio = time.perf_counter()
+        if papel == "leitor":
+            resposta = cliente.get("/")
+            sucesso = resposta.status_code == 200
+        else:
+            resposta = cliente.post(
+                "/post/criar", data={"titulo": "Carga", "conteudo": "texto " * 50}
+            )
+            sucesso = resposta.status_code == 302
+        latencias.append(time.perf_counter() - inicio)
+        ok, erros = (ok + 1, erros) if sucesso else (ok, erros + 1)
+    latencias.sort()
+    fila.put(
+        {
+            "papel": papel,
+            "ok": ok,
+            "erros": erros,
+            "p99_ms": latencias[int(len(latencias) * 0.99)] * 1000 if latencias else 0,
+        }
+    )
+
+
+def medir(leitores, escritores, segundos, ajustes):
+    """
+    Executa um cenário de carga em um banco novo.
+    Parâmetros:
+        leitores (int): Processos lendo a página inicial.
+        escritores (int): Processos criando posts.
+        segundos (float): Duração da medição.
+        ajustes (bool): Se os PRAGMAs e o WAL devem ser aplicados.
+    Retorna:
+        dict: Leituras e escritas por segundo, erros e p99 de cada papel.
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_banco = os.path.join(pasta, "carga.db")
+        _preparar_banco(caminho_banco, ajustes)
+        fila = multiprocessing.Queue()
+        processos = [
+            multiprocessing.Process(
+                target=_trabalhar,
+                args=(caminho_banco, ajustes, papel, segundos, fila),
+            )
+            for papel in ["leitor"] * leitores + ["escritor"] * escritores
+        ]
+        for processo in processos:
+            processo.start()
+        resultados = [fila.get() for _ in processos]
+        for processo in processos:
+            processo.join()
+    resumo = {"ajustes": ajustes, "leitores": leitores, "escritores": escritores}
+    for papel in ("leitor", "escritor"):
+        do_papel = [r for r in resultados if r["papel"] == papel]
+        resumo[papel] = {
+            "por_segundo": round(sum(r["ok"] for r in do_papel) / segundos, 1),
+            "erros": sum(r["erros"] for r in do_papel),
+            "p99_ms": round(max((r["p99_ms"] for r in do_papel), default=0), 1),
+        }
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--leitores", type=int, default=4)
+    parser.add_argument("--escritores", type=int, default=2)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--saida", help="Arquivo JSON onde salvar o relatório")
+    args = parser.parse_args()
+
+    relatorio = []
+    for ajustes in (False, True):
+        base = medir(args.leitores, 0, args.segundos, ajustes)  # Só leituras
+        carga = medir(args.leitores, args.escritores, args.segundos, ajustes)
+        relatorio += [base, carga]
+        print(
+            f"ajustes={'sim' if ajustes else 'não'}: "
+            f"leituras/s {base['leitor']['por_segundo']} -> "
+            f"{carga['leitor']['por_segundo']} com {args.escritores} escritor(es) "
+            f"(p99 {carga['leitor']['p99_ms']} ms, erros {carga['leitor']['erros']}); "
+            f"escritas/s {carga['escritor']['por_segundo']} "
+            f"(erros {carga['escritor']['erros']})"
+        )
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Gerador de dados sintéticos para os benchmarks: usuários com cursos e fotos de
+perfil, e posts distribuídos entre eles, gravados em lote no banco da aplicação.
+"""
+
+import io  # Importa módulo para tratar bytes como arquivo
+import random  # Importa geração de valores aleatórios
+from datetime import datetime, timedelta, timezone  # Importa datas das postagens
+
+from PIL import Image  # Importa biblioteca para gerar as fotos de perfil
+from sqlalchemy import insert  # Importa inserção em lote
+
+from app import bcrypt, db  # Importa o bcrypt e o banco de dados
+from app.busca import reconstruir_indice  # Importa a reconstrução do índice de busca
+from app.forms import EditarPerfilForm  # Importa o formulário com a lista de cursos
+from app.imagens import (  # Importa o processamento das fotos de perfil
+    pasta_imagens,
+    processar_imagem,
+    salvar_variantes,
+)
+from app.models import Curso, Post, Usuario, usuario_curso  # Importa os modelos
+
+TAMANHOS = {
+    "pequeno": {"usuarios": 100, "posts": 1000},
+    "medio": {"usuarios": 10000, "posts": 100000},
+    "grande": {"usuarios": 10000, "posts": 1000000},
+}  # Conjuntos de dados predefinidos
+SENHA = "senha-benchmark"  # Senha de todos os usuários gerados
+LOTE = 5000  # Linhas por instrução de inserção
+PALAVRAS = (
+    "python flask banco dados consulta índice cache template rota usuário post "
+    "curso perfil foto busca teste desempenho memória lista função classe"
+).split()  # Vocabulário dos títulos e conteúdos
+
+
+def nomes_cursos():
+    """
+    Lista os nomes dos cursos oferecidos no formulário de perfil.
+    Retorna:
+        list[str]: Nomes dos cursos.
+    """
+    return [
+        campo.args[0]
+        for nome, campo in vars(EditarPerfilForm).items()
+        if nome.startswith("curso_")
+    ]
+
+
+def _texto(gerador, palavras):
+    return " ".join(gerador.choices(PALAVRAS, k=palavras))
+
+
+def _inserir(tabela, linhas):
+    for inicio in range(0, len(linhas), LOTE):
+        db.session.execute(insert(tabela), linhas[inicio : inicio + LOTE])
+
+
+def _gerar_fotos(gerador, quantidade):
+    """
+    Gera e grava fotos de perfil coloridas, com as mesmas variantes do upload.
+    Parâmetros:
+        gerador (random.Random): Gerador aleatório.
+        quantidade (int): Quantidade de fotos distintas.
+    Retorna:
+        list[str]: Nomes das fotos gravadas.
+    """
+    nomes = []
+    for _ in range(quantidade):
+        buffer = io.BytesIO()
+        cor = tuple(gerador.randrange(256) for _ in range(3))
+        Image.new("RGB", (400, 400), cor).save(buffer, "PNG")
+        nomes.append(
+            salvar_variantes(processar_imagem(buffer.getvalue()), pasta_imagens())
+        )
+    return nomes
+
+
+def gerar_dados(usuarios, posts, fotos=20, semente=42):
+    """
+    Preenche o banco da aplicação atual com dados sintéticos e reconstrói o
+    índice de busca. Todos os usuários têm a senha SENHA e o e-mail
+    'usuarioN@exemplo.com', com N começando em 1.
+    Parâmetros:
+        usuarios (int): Quantidade de usuários.
+        posts (int): Quantidade de posts.
+        fotos (int): Quantidade de fotos de perfil distintas, repartidas entre
+            os usuários (0 mantém a foto padrão).
+        semente (int): Semente do gerador aleatório, para dados reproduzíveis.
+    """
+    gerador = random.Random(semente)
+    senha = bcrypt.generate_password_hash(SENHA).decode("utf-8")  # Um hash para todos
+    cursos = Curso.obter_ou_criar(nomes_cursos())
+    db.session.flush()
+    nomes_fotos = _gerar_fotos(gerador, fotos) or ["default.jpg"]
+    _inserir(
+        Usuario,
+        [
+            {
+                "id": i,
+                "username": f"usuario{i}",
+                "email": f"usuario{i}@exemplo.com",
+                "senha": senha,
+                "foto_perfil": nomes_fotos[i % len(nomes_fotos)],
+            }
+            for i in range(1, usuarios + 1)
+        ],
+    )
+    _inserir(
+        usuario_curso,
+        [
+            {"usuario_id": i, "curso_id": curso.id}
+            for i in range(1, usuarios + 1)
+            for curso in gerador.sample(cursos, gerador.randint(0, 3))
+        ],
+    )  # Até três cursos por usuário
+    inicio = datetime.now(timezone.utc) - timedelta(minutes=posts)
+    for primeiro in range(1, posts + 1, LOTE):
+        db.session.execute(
+            insert(Post),
+            [
+                {
+                    "id": i,
+                    "titulo": _texto(gerador, 5),
+                    "conteudo": _texto(gerador, 60),
+                    "data_postagem": inicio + timedelta(minutes=i),
+                    "usuario_id": int(gerador.paretovariate(1.2)) % usuarios + 1,
+                }
+                for i in range(primeiro, min(primeiro + LOTE, posts + 1))
+            ],
+        )  # Poucos autores concentram muitos posts, como numa comunidade real
+    db.session.commit()
+    reconstruir_indice()
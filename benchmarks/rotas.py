@@ -0,0 +1,284 @@
+"""
+Benchmark das rotas da aplicação: gera um conjunto de dados sintético em um
+banco temporário, executa as rotas principais pelo cliente de teste do Flask e
+informa percentis de latência, consultas SQL por requisição e pico de memória.
+O resultado pode ser salvo em JSON e comparado com o de outro commit.
+
+Uso:
+    python -m benchmarks.rotas --tamanho pequeno --saida resultado.json
+    python -m benchmarks.rotas --tamanho pequeno --comparar resultado.json
+    python -m benchmarks.rotas --tamanho pequeno --codificacao gzip
+"""
+
+import argparse  # Importa leitura dos argumentos da linha de comando
+import json  # Importa serialização do relatório
+import os  # Importa módulo para montar caminhos
+import platform  # Importa a versão do Python usada
+import random  # Importa sorteio dos posts visitados
+import resource  # Importa o uso máximo de memória do processo
+import statistics  # Importa média das medições
+import subprocess  # Importa execução do git para identificar o commit
+import tempfile  # Importa criação da pasta temporária do banco
+import time  # Importa medição do tempo
+import tracemalloc  # Importa medição das alocações do Python
+from datetime import datetime, timezone  # Importa a data do relatório
+
+from app import create_app, db  # Importa a fábrica da aplicação e o banco
+from benchmarks.dados import SENHA, TAMANHOS, gerar_dados  # Importa o gerador
+
+AQUECIMENTO = 3  # Requisições descartadas antes de cada medição
+REQUISICOES_MEMORIA = 5  # Requisições medidas com o tracemalloc ligado
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _percentil(valores, fracao):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fracao))]
+
+
+def criar_app_benchmark(pasta, bcrypt_rounds=4, configuracoes=None):
+    """
+    Cria uma aplicação com banco e imagens em uma pasta temporária e com a
+    instrumentação ligada (o cabeçalho X-SQL-Consultas conta as consultas).
+    Parâmetros:
+        pasta (str): Pasta temporária.
+        bcrypt_rounds (int): Custo do bcrypt.
+        configuracoes (dict | None): Valores que sobrescrevem os do benchmark.
+    Retorna:
+        Flask: Aplicação configurada.
+    """
+    return create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(pasta, 'bench.db')}",
+            "SQLALCHEMY_ENGINE_OPTIONS": {},
+            "SQLALCHEMY_BINDS": {},  # Sem banco de leitura
+            "WTF_CSRF_ENABLED": False,  # Formulários sem token CSRF
+            "BCRYPT_LOG_ROUNDS": bcrypt_rounds,
+            "IMAGENS_ASSINCRONAS": False,
+            "PASTA_IMAGENS": os.path.join(pasta, "imagens"),
+            "CACHE_FRAGMENTOS_CAMINHO": os.path.join(pasta, "fragmentos.db"),
+            "LOGIN_TENTATIVAS_POR_IP": 10**9,  # Sem limite de logins
+            "LOGIN_TENTATIVAS_POR_CONTA": 10**9,
+            "METRICAS_ATIVAS": True,
+            "METRICAS_PERFIL_AMOSTRA": 0.0,
+            **(configuracoes or {}),
+        }
+    )
+
+
+def cenarios(posts):
+    """
+    Lista as requisições medidas.
+    Parâmetros:
+        posts (int): Quantidade de posts gerados.
+    Retorna:
+        list[tuple[str, str, Callable, dict | None]]: Nome, método, função que
+            gera a URL e dados enviados no POST.
+    """
+    sorteio = random.Random(7)
+    return [
+        ("home", "GET", lambda: "/", None),
+        ("home_pagina_antiga", "GET", lambda: f"/?antes={posts // 2}", None),
+        ("usuarios", "GET", lambda: "/usuarios", None),
+        ("post", "GET", lambda: f"/post/{sorteio.randint(1, posts)}", None),
+        ("perfil", "GET", lambda: "/perfil", None),
+        ("busca", "GET", lambda: "/busca?q=python+cache", None),
+        ("api_posts", "GET", lambda: "/api/v1/posts", None),
+        (
+            "api_posts_lote",
+            "GET",
+            lambda: "/api/v1/posts/lote?ids="
+            + ",".join(str(sorteio.randint(1, posts)) for _ in range(20)),
+            None,
+        ),
+        ("api_usuarios", "GET", lambda: "/api/v1/usuarios", None),
+        (
+            "criar_post",
+            "POST",
+            lambda: "/post/criar",
+            {"titulo": "Benchmark", "conteudo": "Post criado pelo benchmark."},
+        ),
+        (
+            "login_registrar",
+            "POST",
+            lambda: "/login-registrar",
+            {"email": "usuario2@exemplo.com", "senha": SENHA, "submit_login": "1"},
+        ),
+    ]
+
+
+def medir_cenario(cliente, metodo, url, dados, repeticoes, cabecalhos=None):
+    """
+    Mede uma requisição repetidas vezes.
+    Parâmetros:
+        cliente (FlaskClient): Cliente de teste já autenticado.
+        metodo (str): 'GET' ou 'POST'.
+        url (Callable): Função que gera a URL de cada requisição.
+        dados (dict | None): Dados do formulário, no POST.
+        repeticoes (int): Quantidade de requisições medidas.
+        cabecalhos (dict | None): Cabeçalhos enviados em cada requisição.
+    Retorna:
+        dict: Percentis de latência (ms), tempo de CPU médio (ms), consultas
+            por requisição, tamanho médio do corpo enviado, pico de memória
+            alocada pelo Python (KiB) e códigos de status.
+    """
+
+    def requisitar():
+        return cliente.open(url(), method=metodo, data=dados, headers=cabecalhos)
+
+    for _ in range(AQUECIMENTO):
+        requisitar()
+    latencias, cpu, consultas, tamanhos, status = [], [], [], [], {}
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        inicio_cpu = time.process_time()
+        resposta = requisitar()
+        cpu.append((time.process_time() - inicio_cpu) * 1000)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(int(resposta.headers.get("X-SQL-Consultas", 0)))
+        tamanhos.append(len(resposta.data))
+        status[resposta.status_code] = status.get(resposta.status_code, 0) + 1
+    tracemalloc.start()  # Passada separada, pois o tracemalloc deixa tudo mais lento
+    pico = 0
+    for _ in range(REQUISICOES_MEMORIA):
+        tracemalloc.reset_peak()
+        requisitar()
+        pico = max(pico, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    return {
+        "p50_ms": round(_percentil(latencias, 0.50), 2),
+        "p90_ms": round(_percentil(latencias, 0.90), 2),
+        "p99_ms": round(_percentil(latencias, 0.99), 2),
+        "media_ms": round(statistics.fmean(latencias), 2),
+        "cpu_ms": round(statistics.fmean(cpu), 2),
+        "consultas_por_requisicao": round(statistics.fmean(consultas), 2),
+        "bytes_resposta": round(statistics.fmean(tamanhos)),
+        "pico_memoria_kib": round(pico / 1024, 1),
+        "status": {str(codigo): total for codigo, total in sorted(status.items())},
+    }
+
+
+def executar(
+    usuarios, posts, repeticoes, fotos=20, bcrypt_rounds=4, codificacao=None
+):
+    """
+    Gera os dados em um banco temporário e mede todos os cenários.
+    Parâmetros:
+        usuarios (int): Quantidade de usuários gerados.
+        posts (int): Quantidade de posts gerados.
+        repeticoes (int): Requisições medidas por cenário.
+        fotos (int): Fotos de perfil distintas.
+        bcrypt_rounds (int): Custo do bcrypt (afeta o cenário de login).
+        codificacao (str | None): Accept-Encoding enviado (None: sem compressão).
+    Retorna:
+        dict: Relatório com o ambiente, os dados gerados e cada cenário.
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        app = criar_app_benchmark(pasta, bcrypt_rounds)
+        with app.app_context():
+            db.create_all()
+            inicio = time.perf_counter()
+            gerar_dados(usuarios, posts, fotos)
+            geracao = time.perf_counter() - inicio
+        cliente = app.test_client()
+        cliente.post(
+            "/login-registrar",
+            data={"email": "usuario2@exemplo.com", "senha": SENHA, "submit_login": "1"},
+        )  # O usuário 2 é o autor com mais posts
+        cabecalhos = {"Accept-Encoding": codificacao} if codificacao else None
+        resultados = {
+            nome: medir_cenario(cliente, metodo, url, dados, repeticoes, cabecalhos)
+            for nome, metodo, url, dados in cenarios(posts)
+        }
+    return {
+        "commit": _commit_atual(),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "usuarios": usuarios,
+        "posts": posts,
+        "repeticoes": repeticoes,
+        "codificacao": codificacao,
+        "geracao_segundos": round(geracao, 1),
+        "memoria_maxima_processo_kib": resource.getrusage(
+            resource.RUSAGE_SELF
+        ).ru_maxrss,
+        "rotas": resultados,
+    }
+
+
+def imprimir(relatorio, anterior=None):
+    """
+    Mostra o relatório em tabela e, se houver, a variação em relação a outro.
+    Parâmetros:
+        relatorio (dict): Relatório da execução atual.
+        anterior (dict | None): Relatório usado na comparação.
+    """
+    print(
+        f"commit {relatorio['commit']}: {relatorio['usuarios']} usuários, "
+        f"{relatorio['posts']} posts (gerados em {relatorio['geracao_segundos']} s), "
+        f"Accept-Encoding: {relatorio.get('codificacao') or 'nenhum'}"
+    )
+    print(
+        f"{'rota':<20}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'CPU ms':>9}"
+        f"{'consultas':>11}{'bytes':>9}{'pico KiB':>11}"
+    )
+    for nome, r in relatorio["rotas"].items():
+        linha = (
+            f"{nome:<20}{r['p50_ms']:>10}{r['p90_ms']:>10}{r['p99_ms']:>10}"
+            f"{r.get('cpu_ms', '-'):>9}{r['consultas_por_requisicao']:>11}"
+            f"{r.get('bytes_resposta', '-'):>9}{r['pico_memoria_kib']:>11}"
+        )
+        antes = (anterior or {}).get("rotas", {}).get(nome)
+        if antes and antes["p50_ms"]:
+            variacao = (r["p50_ms"] - antes["p50_ms"]) / antes["p50_ms"] * 100
+            linha += f"  p50 {variacao:+.0f}% vs {anterior['commit']}"
+        print(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanho", choices=TAMANHOS, default="pequeno")
+    parser.add_argument("--usuarios", type=int, help="Sobrescreve o tamanho")
+    parser.add_argument("--posts", type=int, help="Sobrescreve o tamanho")
+    parser.add_argument("--repeticoes", type=int, default=50)
+    parser.add_argument("--fotos", type=int, default=20)
+    parser.add_argument("--bcrypt-rounds", type=int, default=4)
+    parser.add_argument(
+        "--codificacao", help="Accept-Encoding enviado, por exemplo 'gzip' ou 'br'"
+    )
+    parser.add_argument("--saida", help="Arquivo JSON onde salvar o relatório")
+    parser.add_argument("--comparar", help="Relatório JSON de outro commit")
+    args = parser.parse_args()
+
+    tamanho = TAMANHOS[args.tamanho]
+    relatorio = executar(
+        args.usuarios or tamanho["usuarios"],
+        args.posts or tamanho["posts"],
+        args.repeticoes,
+        args.fotos,
+        args.bcrypt_rounds,
+        args.codificacao,
+    )
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+    imprimir(relatorio, anterior)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
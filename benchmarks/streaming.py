@@ -0,0 +1,188 @@
+"""
+Benchmark da renderização em streaming das listagens: compara o tempo até o
+primeiro byte (TTFB), o tempo total e a memória da página inicial, da lista de
+usuários e do perfil com LISTAGENS_STREAMING desligado e ligado. Cada modo roda
+em um processo próprio, para que o uso máximo de memória (RSS) de um não se
+misture ao do outro.
+
+Uso:
+    python -m benchmarks.streaming --tamanho pequeno --por-pagina 500
+"""
+
+import argparse  # Importa leitura dos argumentos da linha de comando
+import json  # Importa serialização do relatório
+import multiprocessing  # Importa os processos de cada modo
+import resource  # Importa o uso máximo de memória do processo
+import statistics  # Importa média das medições
+import tempfile  # Importa criação da pasta temporária do banco
+import time  # Importa medição do tempo
+import tracemalloc  # Importa medição das alocações do Python
+
+from app import db  # Importa o banco de dados
+from benchmarks.dados import SENHA, TAMANHOS, gerar_dados  # Importa o gerador
+from benchmarks.rotas import (  # Importa a aplicação e os percentis do benchmark
+    AQUECIMENTO,
+    REQUISICOES_MEMORIA,
+    _percentil,
+    criar_app_benchmark,
+)
+
+CENARIOS = [
+    ("home", "/"),
+    ("usuarios", "/usuarios"),
+    ("perfil", "/perfil"),  # O usuário 2 é o autor com mais posts
+]  # Listagens medidas
+
+
+def _requisitar(cliente, url):
+    """
+    Faz uma requisição lendo o corpo aos poucos, como um navegador.
+    Parâmetros:
+        cliente (FlaskClient): Cliente de teste.
+        url (str): URL da listagem.
+    Retorna:
+        tuple[float, float, int]: Segundos até o primeiro pedaço do corpo, segundos
+            até o último e quantidade de pedaços.
+    """
+    inicio = time.perf_counter()
+    resposta = cliente.get(url, buffered=False)
+    primeiro = None
+    pedacos = 0
+    for pedaco in resposta.response:
+        if pedaco and primeiro is None:
+            primeiro = time.perf_counter() - inicio  # Primeiro byte do corpo
+        pedacos += 1
+    total = time.perf_counter() - inicio
+    resposta.close()
+    return primeiro or total, total, pedacos
+
+
+def _medir_modo(pasta, streaming, por_pagina, bloco, repeticoes, fila):
+    """
+    Processo de um modo: mede todas as listagens no banco já gerado.
+    Parâmetros:
+        pasta (str): Pasta temporária com o banco e as imagens.
+        streaming (bool): Valor de LISTAGENS_STREAMING.
+        por_pagina (int): Posts e usuários por página.
+        bloco (int): Valor de LISTAGENS_BLOCO.
+        repeticoes (int): Requisições medidas por listagem.
+        fila (multiprocessing.Queue): Fila onde o resultado é entregue.
+    """
+    app = criar_app_benchmark(
+        pasta,
+        configuracoes={
+            "LISTAGENS_STREAMING": streaming,
+            "LISTAGENS_BLOCO": bloco,
+            "POSTS_POR_PAGINA": por_pagina,
+            "USUARIOS_POR_PAGINA": por_pagina,
+        },
+    )
+    cliente = app.test_client()
+    cliente.post(
+        "/login-registrar",
+        data={"email": "usuario2@exemplo.com", "senha": SENHA, "submit_login": "1"},
+    )  # A lista de usuários exige login
+    for _, url in CENARIOS:
+        for _ in range(AQUECIMENTO):
+            _requisitar(cliente, url)  # Preenche o cache de fragmentos
+    rss_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    resultados = {}
+    for nome, url in CENARIOS:
+        medicoes = [_requisitar(cliente, url) for _ in range(repeticoes)]
+        ttfb = [primeiro * 1000 for primeiro, _, _ in medicoes]
+        totais = [total * 1000 for _, total, _ in medicoes]
+        tracemalloc.start()  # Passada separada: o tracemalloc deixa tudo mais lento
+        pico = 0
+        for _ in range(REQUISICOES_MEMORIA):
+            tracemalloc.reset_peak()
+            _requisitar(cliente, url)
+            pico = max(pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        resultados[nome] = {
+            "ttfb_p50_ms": round(_percentil(ttfb, 0.50), 2),
+            "ttfb_p99_ms": round(_percentil(ttfb, 0.99), 2),
+            "total_p50_ms": round(_percentil(totais, 0.50), 2),
+            "total_media_ms": round(statistics.fmean(totais), 2),
+            "pedacos": medicoes[-1][2],
+            "pico_memoria_kib": round(pico / 1024, 1),
+        }
+    fila.put(
+        {
+            "streaming": streaming,
+            "rss_inicial_kib": rss_inicial,
+            "rss_maximo_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "rotas": resultados,
+        }
+    )
+
+
+def executar(usuarios, posts, por_pagina, bloco, repeticoes):
+    """
+    Gera os dados em um banco temporário e mede os dois modos.
+    Parâmetros:
+        usuarios (int): Quantidade de usuários gerados.
+        posts (int): Quantidade de posts gerados.
+        por_pagina (int): Posts e usuários por página.
+        bloco (int): Valor de LISTAGENS_BLOCO.
+        repeticoes (int): Requisições medidas por listagem.
+    Retorna:
+        list[dict]: Resultado de cada modo (sem e com streaming).
+    """
+    contexto = multiprocessing.get_context("spawn")  # Processos sem a memória deste
+    with tempfile.TemporaryDirectory() as pasta:
+        app = criar_app_benchmark(pasta)
+        with app.app_context():
+            db.create_all()
+            gerar_dados(usuarios, posts)
+        relatorio = []
+        for streaming in (False, True):
+            fila = contexto.Queue()
+            processo = contexto.Process(
+                target=_medir_modo,
+                args=(pasta, streaming, por_pagina, bloco, repeticoes, fila),
+            )
+            processo.start()
+            relatorio.append(fila.get())
+            processo.join()
+    return relatorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanho", choices=TAMANHOS, default="pequeno")
+    parser.add_argument("--por-pagina", type=int, default=500)
+    parser.add_argument("--bloco", type=int, default=50)
+    parser.add_argument("--repeticoes", type=int, default=30)
+    parser.add_argument("--saida", help="Arquivo JSON onde salvar o relatório")
+    args = parser.parse_args()
+
+    tamanho = TAMANHOS[args.tamanho]
+    relatorio = executar(
+        tamanho["usuarios"],
+        tamanho["posts"],
+        args.por_pagina,
+        args.bloco,
+        args.repeticoes,
+    )
+    print(
+        f"{'modo':<11}{'rota':<10}{'TTFB p50':>10}{'TTFB p99':>10}"
+        f"{'total p50':>11}{'pedaços':>9}{'pico KiB':>10}"
+    )
+    for modo in relatorio:
+        nome_modo = "streaming" if modo["streaming"] else "completo"
+        for rota, r in modo["rotas"].items():
+            print(
+                f"{nome_modo:<11}{rota:<10}{r['ttfb_p50_ms']:>10}{r['ttfb_p99_ms']:>10}"
+                f"{r['total_p50_ms']:>11}{r['pedacos']:>9}{r['pico_memoria_kib']:>10}"
+            )
+        print(
+            f"{nome_modo:<11}RSS máximo {modo['rss_maximo_kib']} KiB "
+            f"({modo['rss_maximo_kib'] - modo['rss_inicial_kib']:+} KiB na medição)"
+        )
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import multiprocessing  # Importa módulo para descobrir a quantidade de CPUs
+import os  # Importa módulo para ler variáveis de ambiente
+
+# A aplicação é carregada uma única vez no processo mestre e os workers são
+# criados por fork, compartilhando a memória já inicializada.
+preload_app = True
+workers = int(
+    os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+)  # Quantidade de workers
+threads = int(os.environ.get("GUNICORN_THREADS", 1))  # Threads por worker
+# No Heroku as requisições chegam pelo roteador, que informa o IP do cliente
+# em X-Forwarded-For; a aplicação confia nesse proxy (veja PROXY_SALTOS).
+os.environ.setdefault("PROXY_SALTOS", "1")
+
+
+def post_fork(server, worker):
+    """
+    Descarta, no worker recém-criado, as conexões herdadas do processo mestre,
+    para que cada worker abra as suas próprias conexões nos pools de todos os
+    bancos (o principal e, se configurado, o de leitura).
+    """
+    from app import db  # Importa a instância do banco de dados
+    from main import app  # Importa a aplicação carregada no mestre
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)  # Não fecha as conexões que são do mestre
@@ -0,0 +1,33 @@
+"""indices de post
+
+Índices para as consultas mais frequentes sobre posts: o composto
+(usuario_id, id) atende a contagem de posts por autor, o relacionamento
+'autor' e a timeline de um usuário em ordem de ID; o de data_postagem atende
+as listagens por data.
+
+Revision ID: 3f6a9c1d2b47
+Revises: d24f8b6e1a70
+Create Date: 2026-10-17 17:52:10.412308
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6a9c1d2b47'
+down_revision = 'd24f8b6e1a70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_post_data_postagem'), ['data_postagem'], unique=False)
+        batch_op.create_index('ix_post_usuario_id_id', ['usuario_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_usuario_id_id')
+        batch_op.drop_index(batch_op.f('ix_post_data_postagem'))
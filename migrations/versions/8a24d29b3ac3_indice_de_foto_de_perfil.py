@@ -0,0 +1,30 @@
+"""indice de foto de perfil
+
+Índice de 'usuario.foto_perfil', usado ao trocar a foto para saber se a
+imagem antiga ainda é de algum usuário (e pelo 'limpar-imagens'), sem
+percorrer a tabela inteira.
+
+Revision ID: 8a24d29b3ac3
+Revises: 8c2e5d7a9f13
+Create Date: 2026-10-17 18:40:40.912779
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a24d29b3ac3'
+down_revision = '8c2e5d7a9f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('usuario', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_usuario_foto_perfil'), ['foto_perfil'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('usuario', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_usuario_foto_perfil'))
@@ -0,0 +1,47 @@
+"""datas de alteracao
+
+Colunas com a data da última alteração de posts e usuários, usadas como
+versão dos dados nas respostas condicionais (ETag e Last-Modified). As
+linhas existentes recebem a data da postagem (posts) ou o momento da
+migração (usuários).
+
+Revision ID: 8c2e5d7a9f13
+Revises: 3f6a9c1d2b47
+Create Date: 2026-10-17 18:05:31.270114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2e5d7a9f13'
+down_revision = '3f6a9c1d2b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_edicao', sa.DateTime(), nullable=True))
+    op.execute("UPDATE post SET data_edicao = data_postagem")
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.alter_column('data_edicao', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_post_data_edicao'), ['data_edicao'], unique=False)
+
+    with op.batch_alter_table('usuario', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('atualizado_em', sa.DateTime(), nullable=True))
+    op.execute("UPDATE usuario SET atualizado_em = CURRENT_TIMESTAMP")
+    with op.batch_alter_table('usuario', schema=None) as batch_op:
+        batch_op.alter_column('atualizado_em', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_usuario_atualizado_em'), ['atualizado_em'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('usuario', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_usuario_atualizado_em'))
+        batch_op.drop_column('atualizado_em')
+
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_post_data_edicao'))
+        batch_op.drop_column('data_edicao')
@@ -0,0 +1,87 @@
+"""tabelas de cursos
+
+Troca a coluna 'usuario.cursos', com os nomes dos cursos separados por ';',
+pelas tabelas 'curso' e 'usuario_curso'. Os cursos de cada usuário são
+copiados para as tabelas novas antes de a coluna ser removida.
+
+Revision ID: b71d4e0a9c35
+Revises: eff2def2251e
+Create Date: 2026-10-17 17:47:25.118904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71d4e0a9c35'
+down_revision = 'eff2def2251e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    curso = op.create_table('curso',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nome', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('curso', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_curso_nome'), ['nome'], unique=True)
+
+    usuario_curso = op.create_table('usuario_curso',
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('curso_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['curso_id'], ['curso.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuario.id'], ),
+    sa.PrimaryKeyConstraint('usuario_id', 'curso_id')
+    )
+    with op.batch_alter_table('usuario_curso', schema=None) as batch_op:
+        batch_op.create_index('ix_usuario_curso_curso_id', ['curso_id', 'usuario_id'], unique=False)
+
+    conexao = op.get_bind()
+    inscricoes = {
+        usuario_id: list(dict.fromkeys(nome for nome in cursos.split(';') if nome))
+        for usuario_id, cursos in conexao.execute(
+            sa.text("SELECT id, cursos FROM usuario WHERE cursos IS NOT NULL AND cursos <> ''")
+        )
+    }  # Cursos de cada usuário, sem repetições
+    nomes = list(dict.fromkeys(nome for lista in inscricoes.values() for nome in lista))
+    if nomes:
+        op.bulk_insert(curso, [{'nome': nome} for nome in nomes])
+        ids = dict(conexao.execute(sa.text("SELECT nome, id FROM curso")).all())
+        op.bulk_insert(usuario_curso, [
+            {'usuario_id': usuario_id, 'curso_id': ids[nome]}
+            for usuario_id, lista in inscricoes.items()
+            for nome in lista
+        ])
+
+    with op.batch_alter_table('usuario', schema=None) as batch_op:
+        batch_op.drop_column('cursos')
+
+
+def downgrade():
+    with op.batch_alter_table('usuario', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cursos', sa.String(length=200), nullable=True))
+
+    conexao = op.get_bind()
+    cursos = {}
+    for usuario_id, nome in conexao.execute(sa.text(
+        "SELECT usuario_curso.usuario_id, curso.nome FROM usuario_curso "
+        "JOIN curso ON curso.id = usuario_curso.curso_id ORDER BY curso.id"
+    )):
+        cursos.setdefault(usuario_id, []).append(nome)
+    for usuario_id, nomes in cursos.items():
+        conexao.execute(
+            sa.text("UPDATE usuario SET cursos = :cursos WHERE id = :id"),
+            {'cursos': ';'.join(nomes), 'id': usuario_id},
+        )
+
+    with op.batch_alter_table('usuario_curso', schema=None) as batch_op:
+        batch_op.drop_index('ix_usuario_curso_curso_id')
+
+    op.drop_table('usuario_curso')
+    with op.batch_alter_table('curso', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_curso_nome'))
+
+    op.drop_table('curso')
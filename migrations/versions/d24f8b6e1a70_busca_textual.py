@@ -0,0 +1,37 @@
+"""busca textual
+
+Tabela FTS5 da busca de posts, preenchida com os posts existentes. Só existe
+no SQLite; nos outros bancos a busca não usa índice e esta revisão não faz nada.
+
+Revision ID: d24f8b6e1a70
+Revises: b71d4e0a9c35
+Create Date: 2026-10-17 17:49:12.530417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd24f8b6e1a70'
+down_revision = 'b71d4e0a9c35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS post_busca USING fts5("
+            "titulo, conteudo, tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute("DELETE FROM post_busca")
+        op.execute(
+            "INSERT INTO post_busca (rowid, titulo, conteudo) "
+            "SELECT id, titulo, conteudo FROM post"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS post_busca")
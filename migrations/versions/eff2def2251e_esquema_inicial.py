@@ -0,0 +1,48 @@
+"""esquema inicial
+
+Esquema criado pelo db.create_all da versão original, antes das migrações:
+usuários (com os cursos como texto separado por ';' na coluna 'cursos') e
+posts. Bancos já existentes devem ser marcados com
+'flask db stamp eff2def2251e' em vez de executar esta revisão.
+
+Revision ID: eff2def2251e
+Revises:
+Create Date: 2026-10-17 17:44:01.761917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'eff2def2251e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('usuario',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('senha', sa.String(length=200), nullable=False),
+    sa.Column('foto_perfil', sa.String(length=200), nullable=True),
+    sa.Column('cursos', sa.String(length=200), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('post',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(length=100), nullable=False),
+    sa.Column('conteudo', sa.Text(), nullable=False),
+    sa.Column('data_postagem', sa.DateTime(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuario.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('post')
+    op.drop_table('usuario')